@@ -1,17 +1,100 @@
 import os
+import atexit
+import queue
+import threading
+from concurrent.futures import Future
+from itertools import repeat
 import fitz  # PyMuPDF
 from PIL import Image
 from psd_tools import PSDImage
 import win32com.client
 import pythoncom
 
-def convert_pdf_to_images(file_path, output_dir, fmt='jpg'):
+# Optional: libjpeg-turbo via PyTurboJPEG for the PDF JPEG encode.
+# Falls back to MuPDF's own encoder when the package or library is missing.
+try:
+    import numpy as np
+    from turbojpeg import TurboJPEG, TJPF_RGB
+    _turbo = TurboJPEG()
+except Exception:
+    _turbo = None
+
+def _pixmap_to_image(pix):
+    """
+    Wrap a pixmap's samples in a PIL image.
+    samples_mv is a memoryview of MuPDF's own buffer, so this skips the
+    extra bytes copy that pix.samples makes. Older PyMuPDF lacks it.
+    """
+    samples = getattr(pix, 'samples_mv', None)
+    if samples is not None:
+        return Image.frombuffer("RGB", (pix.width, pix.height), samples, "raw", "RGB", 0, 1)
+    return Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+
+def _encode_jpeg_turbo(pix, out_path, dpi, quality=95):
+    """
+    Encode an RGB pixmap with libjpeg-turbo straight from its sample buffer.
+    """
+    arr = np.frombuffer(pix.samples_mv, dtype=np.uint8).reshape(pix.height, pix.stride // 3, 3)[:, :pix.width]
+    data = bytearray(_turbo.encode(arr, quality=quality, pixel_format=TJPF_RGB))
+    # Stamp the DPI into the JFIF header (units=1 dots/inch, X/Y density)
+    if data[6:11] == b"JFIF\x00":
+        data[13] = 1
+        data[14:18] = dpi.to_bytes(2, 'big') * 2
+    with open(out_path, 'wb') as f:
+        f.write(data)
+
+def _render_page(file_path, page_index, dpi, out_path, fmt):
+    """
+    Render a single PDF page to an image file.
+    Runs inside a worker process, so it opens its own document handle.
+    """
+    doc = fitz.open(file_path)
+    try:
+        page = doc.load_page(page_index)
+        # PDF user space is 72 units per inch
+        zoom = dpi / 72.0
+        mat = fitz.Matrix(zoom, zoom)
+        # Plain RGB, no alpha channel: 3 bytes per pixel to move and encode
+        pix = page.get_pixmap(matrix=mat, colorspace=fitz.csRGB, alpha=False)
+        pix.set_dpi(dpi, dpi)
+
+        # Let MuPDF encode directly; older builds have no jpg_quality
+        # argument, so go through PIL there.
+        try:
+            if fmt == 'jpg' and _turbo is not None:
+                _encode_jpeg_turbo(pix, out_path, dpi)
+            elif fmt == 'jpg':
+                pix.save(out_path, jpg_quality=95)
+            else:
+                pix.save(out_path)
+        except TypeError:
+            img = _pixmap_to_image(pix)
+            if fmt == 'jpg':
+                img.save(out_path, quality=95, dpi=(dpi, dpi))
+            else:
+                img.save(out_path, dpi=(dpi, dpi))
+            del img
+
+        # Drop the reference so MuPDF can free the backing bitmap right away,
+        # then empty its resource store so worker RSS stays flat on long PDFs
+        pix = None
+        page = None
+        fitz.TOOLS.store_shrink(100)
+        return out_path
+    finally:
+        doc.close()
+
+def convert_pdf_to_images(file_path, output_dir, fmt='jpg', dpi=150):
     """
     Convert PDF pages to images using PyMuPDF.
+    Pages are rendered in parallel across a process pool.
+    dpi: 150 is plenty for screen use; 300 for print quality.
     """
-    results = []
     try:
-        doc = fitz.open(file_path)
+        # Only read the page count here; workers hold their own MuPDF state
+        with fitz.open(file_path) as doc:
+            page_count = len(doc)
+
         base_name = os.path.splitext(os.path.basename(file_path))[0]
         
         # Create folder for this file
@@ -19,34 +102,18 @@ def convert_pdf_to_images(file_path, output_dir, fmt='jpg'):
         if not os.path.exists(file_out_dir):
             os.makedirs(file_out_dir)
 
-        for i in range(len(doc)):
-            page = doc.load_page(i)
-            # Use 2.0 zoom for better quality (approx 144 dpi) -> or 300/72 * 1 = 4.16 for 300 dpi
-            # Let's use zoom=2 for balance (approx 150 dpi screen quality)
-            # User wants "High Quality", let's give them 300 DPI equivalent (~4x)
-            zoom = 4.0 
-            mat = fitz.Matrix(zoom, zoom)
-            pix = page.get_pixmap(matrix=mat)
-            
-            # Save
-            ext = f".{fmt}"
-            out_name = f"{base_name}_page{i+1:03d}{ext}"
-            out_path = os.path.join(file_out_dir, out_name)
-            
-            # PyMuPDF save
-            if fmt == 'jpg':
-                pix.save(out_path) # saves as png/jpg based on extension? 
-                # pix.save handles basics. For jpg specific quality controls, better use PIL?
-                # fitz pixmap can save directly.
-                img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                img.save(out_path, quality=95, dpi=(300, 300))
-            else:
-                img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                img.save(out_path, dpi=(300, 300))
-                
-            results.append(out_path)
+        ext = f".{fmt}"
+        out_paths = [os.path.join(file_out_dir, f"{base_name}_page{i+1:03d}{ext}") for i in range(page_count)]
+
+        # Several files may convert at once, so pages go to the shared
+        # pool instead of each PDF starting its own set of processes
+        from utils import get_process_pool
+        rendered = 0
+        for _ in get_process_pool().map(_render_page, repeat(file_path), range(page_count),
+                                        repeat(dpi), out_paths, repeat(fmt)):
+            rendered += 1
             
-        return True, f"Converted {len(results)} pages."
+        return True, f"Converted {rendered} pages."
     except Exception as e:
         return False, str(e)
 
@@ -84,21 +151,81 @@ def convert_psd_to_images(file_path, output_dir, fmt='jpg'):
     except Exception as e:
         return False, str(e)
 
+# PowerPoint takes seconds to start, so one instance is shared by every
+# conversion and only quit when the app exits. It belongs to one long-lived
+# COM thread that creates, uses and quits it: a proxy shared by pool threads
+# would die with the apartment of whichever short-lived thread created it.
+# The thread also runs one export at a time, as PowerPoint needs.
+_powerpoint = None # only touched on the PowerPoint thread
+_ppt_thread = None
+_ppt_thread_lock = threading.Lock()
+_ppt_jobs = queue.Queue()
+
+def _ppt_worker():
+    # A daemon thread, so it is still running when atexit quits PowerPoint
+    pythoncom.CoInitializeEx(pythoncom.COINIT_MULTITHREADED)
+    while True:
+        fn, args, future = _ppt_jobs.get()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+
+def _run_on_ppt_thread(fn, *args, timeout=None):
+    """Run fn(*args) on the PowerPoint thread and return its result."""
+    global _ppt_thread
+    with _ppt_thread_lock:
+        if _ppt_thread is None:
+            _ppt_thread = threading.Thread(target=_ppt_worker, name="PowerPoint", daemon=True)
+            _ppt_thread.start()
+    future = Future()
+    _ppt_jobs.put((fn, args, future))
+    return future.result(timeout)
+
+def _ppt_export(abs_path, file_out_dir, save_format):
+    """Runs on the PowerPoint thread: open the file, export every slide, close it."""
+    global _powerpoint
+    if _powerpoint is None:
+        _powerpoint = win32com.client.Dispatch("PowerPoint.Application")
+    try:
+        presentation = _powerpoint.Presentations.Open(abs_path, WithWindow=False)
+    except Exception:
+        # The cached instance may have been closed by the user, start a new one
+        _powerpoint = win32com.client.Dispatch("PowerPoint.Application")
+        presentation = _powerpoint.Presentations.Open(abs_path, WithWindow=False)
+    
+    # This exports ALL slides into the folder
+    try:
+        presentation.SaveAs(file_out_dir, save_format)
+    finally:
+        presentation.Close()
+
+def _ppt_quit():
+    global _powerpoint
+    if _powerpoint is not None:
+        powerpoint, _powerpoint = _powerpoint, None
+        powerpoint.Quit()
+
+def _quit_powerpoint():
+    """
+    Quit the shared PowerPoint at exit, on the thread that created it.
+    """
+    if _ppt_thread is None:
+        return
+    try:
+        # Do not hang the exit on an unresponsive PowerPoint
+        _run_on_ppt_thread(_ppt_quit, timeout=10)
+    except Exception as e:
+        print(f"Warning: Failed to quit PowerPoint: {e!r}")
+
+atexit.register(_quit_powerpoint)
+
 def convert_ppt_to_images(file_path, output_dir, fmt='jpg'):
     """
     Convert PPT/PPTX to images using Windows COM interface.
     """
     try:
-        # COM initialization for threads
-        pythoncom.CoInitialize()
-        
-        powerpoint = win32com.client.Dispatch("PowerPoint.Application")
-        # Ensure it doesn't pop up intrusively, though it needs to run
-        # powerpoint.Visible = True # PowerPoint often requires visibility to export
-        
         abs_path = os.path.abspath(file_path)
-        presentation = powerpoint.Presentations.Open(abs_path, WithWindow=False)
-        
         base_name = os.path.splitext(os.path.basename(file_path))[0]
         file_out_dir = os.path.join(output_dir, base_name)
         if not os.path.exists(file_out_dir):
@@ -108,17 +235,32 @@ def convert_ppt_to_images(file_path, output_dir, fmt='jpg'):
         # ppSaveAsJPG = 17, ppSaveAsPNG = 18
         save_format = 17 if fmt == 'jpg' else 18
         
-        # This exports ALL slides into the folder
-        presentation.SaveAs(file_out_dir, save_format)
-        presentation.Close()
+        _run_on_ppt_thread(_ppt_export, abs_path, file_out_dir, save_format)
         
-        # Check results
-        files = os.listdir(file_out_dir)
-        count = len([f for f in files if f.lower().endswith(f".{fmt}")])
+        # Check results (DirEntry.is_file() uses the cached d_type, no extra stat)
+        suffix = f".{fmt}"
+        with os.scandir(file_out_dir) as entries:
+            count = sum(1 for e in entries if e.name.lower().endswith(suffix) and e.is_file())
         
         return True, f"Converted {count} slides."
         
     except Exception as e:
         return False, f"PPT Error (Requires MS Office): {e}"
-    finally:
-        pythoncom.CoUninitialize()
+
+# Extension -> converter, all called as fn(file_path, output_dir, fmt, dpi)
+_CONVERTERS = {
+    '.pdf': convert_pdf_to_images,
+    '.psd': lambda file_path, output_dir, fmt, dpi: convert_psd_to_images(file_path, output_dir, fmt),
+    '.ppt': lambda file_path, output_dir, fmt, dpi: convert_ppt_to_images(file_path, output_dir, fmt),
+}
+_CONVERTERS['.pptx'] = _CONVERTERS['.ppt']
+
+def convert_file(file_path, output_dir, fmt='jpg', dpi=150):
+    """
+    Convert one PDF/PSD/PPT file, dispatching on its extension.
+    Returns (success, message) like the per-format converters.
+    """
+    fn = _CONVERTERS.get(os.path.splitext(file_path)[1].lower())
+    if fn is None:
+        return False, "Unsupported format"
+    return fn(file_path, output_dir, fmt, dpi)
@@ -1,7 +1,8 @@
 import os
+from functools import lru_cache
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QLabel, QScrollArea, QWidget, QFrame)
 from PyQt6.QtGui import QPixmap, QPainter, QPen, QColor, QImage
-from PyQt6.QtCore import Qt, QPoint
+from PyQt6.QtCore import Qt, QPoint, QRect, QTimer, QThread, pyqtSignal
 from PIL import Image, ImageDraw
 
 class MagnifierWidget(QLabel):
@@ -12,39 +13,95 @@ class MagnifierWidget(QLabel):
         self.setVisible(False)
         self.setWindowFlags(Qt.WindowType.ToolTip) # Make it float above like a tooltip
 
+def _proximity_mask(lines, length, threshold=10):
+    """
+    Returns a bytearray where index i is 1 if any line lies closer than
+    `threshold` pixels to i, so hover checks become a single lookup.
+    """
+    mask = bytearray(length)
+    for line in lines:
+        start = max(0, line - threshold + 1)
+        end = min(length, line + threshold)
+        if start < end:
+            mask[start:end] = b"\x01" * (end - start)
+    return mask
+
+def build_thumbnail(path, target_width=600):
+    """
+    Decode `path` into a preview roughly `target_width` pixels wide.
+    Returns (rgba_bytes, width, height, orig_w, orig_h).
+    """
+    with Image.open(path) as src:
+        orig_w, orig_h = src.size
+        # Constraint mainly by width, never upscale (small images show 1:1)
+        scale = min(target_width / orig_w, target_width * 10 / orig_h, 1.0)
+        display_size = (max(1, round(orig_w * scale)), max(1, round(orig_h * scale)))
+        # draft() lets libjpeg decode JPEGs at 1/2, 1/4 or 1/8 scale
+        src.draft('RGB', display_size)
+        # resize() already returns a new image, no full-size copy() needed;
+        # BICUBIC is enough for a preview, the decoder already supersampled
+        thumb = src if src.size == display_size else src.resize(display_size, Image.Resampling.BICUBIC)
+        data = thumb.convert("RGBA").tobytes("raw", "RGBA")
+    return data, thumb.width, thumb.height, orig_w, orig_h
+
+@lru_cache(maxsize=8)
+def _cached_thumbnail(path, mtime_ns, size, target_width):
+    # mtime/size are part of the key so an edited file is decoded again
+    return build_thumbnail(path, target_width)
+
+class PreviewWorker(QThread):
+    ready_signal = pyqtSignal(bytes, int, int, int, int)
+    error_signal = pyqtSignal(str)
+
+    def __init__(self, image_path):
+        super().__init__()
+        self.image_path = image_path
+
+    def run(self):
+        try:
+            # Re-opening the preview for the same image reuses the decoded thumbnail
+            st = os.stat(self.image_path)
+            self.ready_signal.emit(*_cached_thumbnail(self.image_path, st.st_mtime_ns, st.st_size, 600))
+        except Exception as e:
+            self.error_signal.emit(str(e))
+
 class PreviewLabel(QLabel):
-    def __init__(self, original_image_path, rows, cols, parent=None):
+    def __init__(self, original_image_path, rows, cols, thumbnail, parent=None):
         super().__init__(parent)
         self.original_image_path = original_image_path
         self.rows = rows
         self.cols = cols
         
-        # Load original image for magnifier reference
-        self.pil_image = Image.open(self.original_image_path)
-        self.orig_w, self.orig_h = self.pil_image.size
-        
-        # Create thumbnail roughly 600px width
-        self.target_display_width = 600
-        display_ratio = self.orig_h / self.orig_w
-        self.display_h = int(self.target_display_width * display_ratio)
-        
-        # Create thumbnail image
-        self.thumb = self.pil_image.copy()
-        self.thumb.thumbnail((self.target_display_width, self.target_display_width * 10)) # Constraint mainly by width
+        # The full-res source is decoded lazily by the magnifier and
+        # released again when the cursor leaves.
+        self.pil_image = None
         
-        # Actual size of thumbnail might be slightly different than calculated if aspect ratio preserved
-        self.display_w, self.display_h = self.thumb.size
+        # Thumbnail comes pre-decoded from PreviewWorker (see build_thumbnail)
+        self._thumb_bytes, self.display_w, self.display_h, self.orig_w, self.orig_h = thumbnail
         
-        # Convert PIL to QPixmap
-        data = self.thumb.convert("RGBA").tobytes("raw", "RGBA")
-        qim = QImage(data, self.display_w, self.display_h, QImage.Format.Format_RGBA8888)
+        # Convert to QPixmap
+        # QImage does not copy the buffer it is given, so keep it alive on self
+        # and pass the stride explicitly to match the RGBA row layout.
+        qim = QImage(self._thumb_bytes, self.display_w, self.display_h, 4 * self.display_w, QImage.Format.Format_RGBA8888)
         self.pixmap_base = QPixmap.fromImage(qim)
         
         self.setPixmap(self.pixmap_base)
         self.setMouseTracking(True)
+
+        # Small images are shown 1:1, so magnifier crops can come straight
+        # from the display pixmap without touching the PIL source.
+        self.is_full_res = (self.display_w, self.display_h) == (self.orig_w, self.orig_h)
         
         # Magnifier
         self.magnifier = MagnifierWidget(self)
+
+        # Coalesce mouse moves: render the magnifier at most once per frame
+        self._pending_pos = None
+        self._last_crop_box = None
+        self._magnify_timer = QTimer(self)
+        self._magnify_timer.setSingleShot(True)
+        self._magnify_timer.setInterval(16)
+        self._magnify_timer.timeout.connect(self._do_magnify)
         
         # Calculate grid lines (on the display image)
         self.h_lines = [] # y coordinates
@@ -57,6 +114,10 @@ class PreviewLabel(QLabel):
         step_x = self.display_w / self.cols
         for i in range(1, self.cols):
             self.v_lines.append(int(i * step_x))
+
+        # Precomputed "near a line" lookups for mouseMoveEvent
+        self._near_h = _proximity_mask(self.h_lines, self.display_h)
+        self._near_v = _proximity_mask(self.v_lines, self.display_w)
             
     def paintEvent(self, event):
         super().paintEvent(event)
@@ -78,15 +139,37 @@ class PreviewLabel(QLabel):
         x, y = pos.x(), pos.y()
         
         # Check if near lines (threshold 10px)
-        near_h = any(abs(y - ly) < 10 for ly in self.h_lines)
-        near_v = any(abs(x - lx) < 10 for lx in self.v_lines)
+        near_h = 0 <= y < len(self._near_h) and self._near_h[y]
+        near_v = 0 <= x < len(self._near_v) and self._near_v[x]
         
         if near_h or near_v:
-            self.show_magnifier(x, y)
+            self._pending_pos = (x, y)
+            if not self._magnify_timer.isActive():
+                self._magnify_timer.start()
         else:
+            self._pending_pos = None
+            self._magnify_timer.stop()
             self.magnifier.setVisible(False)
             
         super().mouseMoveEvent(event)
+
+    def leaveEvent(self, event):
+        # Drop the decoded source while idle, it is reloaded on the next hover
+        self._pending_pos = None
+        self._magnify_timer.stop()
+        self.magnifier.setVisible(False)
+        self.release_source()
+        super().leaveEvent(event)
+
+    def release_source(self):
+        if self.pil_image is not None:
+            self.pil_image.close()
+            self.pil_image = None
+        self._last_crop_box = None
+
+    def _do_magnify(self):
+        if self._pending_pos is not None:
+            self.show_magnifier(*self._pending_pos)
         
     def show_magnifier(self, view_x, view_y):
         # Map view coordinate to original coordinate
@@ -114,18 +197,30 @@ class PreviewLabel(QLabel):
             top = max(0, bottom - crop_size)
             
         try:
-            crop = self.pil_image.crop((left, top, left + crop_size, top + crop_size))
-            
-            # Convert to QPixmap
-            c_data = crop.convert("RGBA").tobytes("raw", "RGBA")
-            c_qim = QImage(c_data, crop.width, crop.height, QImage.Format.Format_RGBA8888)
-            c_pix = QPixmap.fromImage(c_qim)
-            
-            self.magnifier.setPixmap(c_pix)
+            # Same crop as last time (cursor moved within a source pixel): only reposition
+            box = (left, top, left + crop_size, top + crop_size)
+            if box != self._last_crop_box:
+                if self.is_full_res:
+                    c_pix = self.pixmap_base.copy(QRect(left, top, crop_size, crop_size))
+                else:
+                    if self.pil_image is None:
+                        self.pil_image = Image.open(self.original_image_path)
+                    crop = self.pil_image.crop(box)
+                    if crop.mode != "RGBA":
+                        crop = crop.convert("RGBA")
+                    
+                    # Convert to QPixmap
+                    self._crop_bytes = crop.tobytes("raw", "RGBA")
+                    c_qim = QImage(self._crop_bytes, crop.width, crop.height, 4 * crop.width, QImage.Format.Format_RGBA8888)
+                    c_pix = QPixmap.fromImage(c_qim)
+                
+                self.magnifier.setPixmap(c_pix)
+                self._last_crop_box = box
             self.magnifier.setVisible(True)
             self.magnifier.move(view_x + 15, view_y + 15) # Offset a bit
             self.magnifier.raise_()
         except Exception:
+            self._last_crop_box = None
             self.magnifier.setVisible(False)
 
 class PreviewDialog(QDialog):
@@ -147,9 +242,34 @@ class PreviewDialog(QDialog):
         c_layout = QVBoxLayout(container)
         c_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
         
+        self.image_path = image_path
+        self.rows = rows
+        self.cols = cols
+        self.preview_label = None
+        
+        # Decoding a large image takes a while, so show a placeholder and
+        # build the thumbnail off the GUI thread.
+        self.status_label = QLabel("正在加载预览...")
+        c_layout.addWidget(self.status_label)
+        self.c_layout = c_layout
+        
+        self.worker = PreviewWorker(image_path)
+        self.worker.ready_signal.connect(self.on_thumbnail_ready)
+        self.worker.error_signal.connect(self.on_thumbnail_error)
+        self.worker.start()
+        
+    def on_thumbnail_ready(self, data, w, h, orig_w, orig_h):
         try:
-            self.preview_label = PreviewLabel(image_path, rows, cols)
-            c_layout.addWidget(self.preview_label)
+            self.preview_label = PreviewLabel(self.image_path, self.rows, self.cols, (data, w, h, orig_w, orig_h))
+            self.status_label.hide()
+            self.c_layout.addWidget(self.preview_label)
         except Exception as e:
-            err_label = QLabel(f"无法加载预览: {str(e)}")
-            c_layout.addWidget(err_label)
+            self.on_thumbnail_error(str(e))
+            
+    def on_thumbnail_error(self, message):
+        self.status_label.setText(f"无法加载预览: {message}")
+        
+    def done(self, result):
+        # The worker must not outlive the dialog that owns its signals
+        self.worker.wait()
+        super().done(result)
@@ -1,56 +1,226 @@
 import sys
 import os
+import errno
 import re
-from datetime import datetime
+import heapq
+import hashlib
+import uuid
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import namedtuple
+from itertools import groupby
+from functools import lru_cache
+from dataclasses import dataclass
+from typing import Optional
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QPushButton, QListWidget, QLabel, 
-                             QMessageBox, QAbstractItemView, QRadioButton, QButtonGroup,
-                             QSlider, QGroupBox, QLineEdit, QTabWidget, QCheckBox, QSizePolicy)
-from PyQt6.QtCore import Qt, QMimeData, QThread, pyqtSignal
+                             QMessageBox, QAbstractItemView, QRadioButton,
+                             QSlider, QGroupBox, QLineEdit, QTabWidget, QCheckBox, QSizePolicy,
+                             QMenu, QInputDialog, QListWidgetItem)
+from PyQt6.QtCore import Qt, QMimeData, QThreadPool, QRunnable, QObject, pyqtSignal
 from PyQt6.QtGui import QDragEnterEvent, QDropEvent, QIntValidator, QIcon
 
-from sorter import sort_files
-from stitcher import stitch_images
-from grid_preview import PreviewDialog
-from slicer import slice_image, slice_grid_image
-from merger import merge_images_to_pdf
-from converter import convert_pdf_to_images, convert_psd_to_images, convert_ppt_to_images
-from PyQt6.QtGui import QPixmap, QCursor
-from PyQt6.QtCore import QTimer, QPoint
+from sorter import sort_files, sort_key
+# stitcher/slicer/merger/converter/grid_preview pull in Pillow, PyMuPDF,
+# psd-tools and COM; they are imported where first used so the window
+# shows up without paying for tabs the user never touches.
+from PyQt6.QtGui import QPixmap, QPixmapCache, QCursor, QImage, QImageReader, QImageIOHandler
+from PyQt6.QtCore import QTimer, QBasicTimer, QPoint, QRect, QSize
+
+# All outputs go to the desktop; the home dir cannot change while we run
+_DESKTOP_PATH = os.path.join(os.path.expanduser("~"), "Desktop")
+
+# Size limit per slider position: KB for stitch/slice, MB per page for combine
+_KB_LIMITS = (0, 150, 300, 500, 750, 1000)
+_MB_LIMITS = (0, 1, 5, 10, 20, 50)
+
+# Combine list items remember their file size here after the first size sort
+_SIZE_ROLE = Qt.ItemDataRole.UserRole + 1
+
+# Digit runs for the combine list's natural sort
+_NATURAL_RE = re.compile(r'(\d+)')
+
+# Hover thumbnails persist here between sessions, pruned oldest-first past the limit
+_THUMB_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ImageMatrix", "thumbs")
+_THUMB_DIR_LIMIT = 500 * 1024 * 1024
+_thumb_dir_pruned = False
+
+FileEntry = namedtuple('FileEntry', 'path dirname basename stem ext')
+
+@lru_cache(maxsize=4096)
+def _split_path(path):
+    """
+    Parse a path into (dirname, basename, stem, ext) once.
+    List refreshes and renames parse the same strings over and over.
+    """
+    dirname, basename = os.path.split(path)
+    stem, ext = os.path.splitext(basename)
+    return FileEntry(path, dirname, basename, stem, ext)
+
+def _prune_thumb_dir():
+    """Delete the least recently used disk thumbnails until the cache fits its limit."""
+    entries = []
+    try:
+        with os.scandir(_THUMB_DIR) as it:
+            for e in it:
+                if e.is_file():
+                    st = e.stat()
+                    entries.append((st.st_mtime, st.st_size, e.path))
+    except OSError:
+        return
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= _THUMB_DIR_LIMIT:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+
+def _scaled_preview(path, mtime_ns, size):
+    """
+    Hover thumbnail for path as a QImage fitted into 200x200.
+    mtime/size are part of the key so an edited file is decoded again.
+    Tries the disk cache before a real decode; the in-memory tier is
+    QPixmapCache on the GUI side (see PreviewListWidget.show_preview).
+    Runs on pool threads, so it must not create QPixmaps.
+    """
+    global _thumb_dir_pruned
+    key = hashlib.sha1(f"{path}|{mtime_ns}|{size}".encode('utf-8')).hexdigest()
+    base = os.path.join(_THUMB_DIR, key)
+    for ext in ('.jpg', '.png'):
+        image = QImage(base + ext)
+        if not image.isNull():
+            try:
+                os.utime(base + ext) # mtime doubles as last-use time for pruning
+            except OSError:
+                pass
+            return image
+
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    src_size = reader.size()
+    if src_size.isValid() and reader.supportsOption(QImageIOHandler.ImageOption.ScaledSize):
+        # Lets the JPEG decoder scale while decoding instead of after
+        reader.setScaledSize(src_size.scaled(QSize(200, 200), Qt.AspectRatioMode.KeepAspectRatio))
+    image = reader.read()
+    if image.isNull():
+        return None
+    # Formats without scaled decoding (PNG, ...) arrive full size. Smoothing
+    # every source pixel is the slow part, so first drop by the largest power
+    # of two that keeps at least 2x the target, then smooth the rest.
+    factor = 1
+    longest = max(image.width(), image.height())
+    while longest // (factor * 2) >= 400:
+        factor *= 2
+    if factor > 1:
+        image = image.scaled(max(1, image.width() // factor), max(1, image.height() // factor),
+                             Qt.AspectRatioMode.IgnoreAspectRatio, Qt.TransformationMode.FastTransformation)
+    # Fit the long side to 200, small images included (as QPixmap.scaled did)
+    if max(image.width(), image.height()) != 200:
+        image = image.scaled(200, 200, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+
+    # JPEG unless the thumbnail needs its alpha channel; written under a
+    # temporary name so a concurrent reader never sees half a file
+    final_path, fmt = (base + '.png', 'PNG') if image.hasAlphaChannel() else (base + '.jpg', 'JPEG')
+    try:
+        if not _thumb_dir_pruned:
+            _thumb_dir_pruned = True
+            _prune_thumb_dir()
+        os.makedirs(_THUMB_DIR, exist_ok=True)
+        if image.save(final_path + '.part', fmt, 80):
+            os.replace(final_path + '.part', final_path)
+    except OSError:
+        pass
+    return image
+
+class PreviewSignals(QObject):
+    # (request id, decoded thumbnail); a null QImage means nothing to show
+    ready_signal = pyqtSignal(int, QImage)
+
+class PreviewLoader(QRunnable):
+    def __init__(self, request_id, path, mtime_ns, size, signals):
+        super().__init__()
+        self.request_id = request_id
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.signals = signals
+
+    def run(self):
+        image = None
+        try:
+            image = _scaled_preview(self.path, self.mtime_ns, self.size)
+        except Exception:
+            pass
+        self.signals.ready_signal.emit(self.request_id, image if image is not None else QImage())
 
 class PreviewListWidget(QListWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setMouseTracking(True)
-        self.preview_timer = QTimer(self)
-        self.preview_timer.setSingleShot(True)
-        self.preview_timer.timeout.connect(self.show_preview)
+        # Hover delay; QBasicTimer is restarted on every row change and is
+        # cheaper than a QTimer (no QObject, no signal, fires timerEvent)
+        self.preview_timer = QBasicTimer()
         self.hover_item = None
         self.preview_label = None
+
+        # Thumbnails decode on the thread pool; only the newest request is shown
+        self._preview_request = 0
+        self._preview_key = None
+        self._preview_signals = PreviewSignals(self)
+        self._preview_signals.ready_signal.connect(self.on_preview_ready)
+
+        # Row rect under the cursor: moves inside it skip the itemAt() lookup.
+        # Anything that can shift rows under a still cursor invalidates it.
+        self._hover_rect = QRect()
+        self.verticalScrollBar().valueChanged.connect(self._reset_hover_rect)
+        self.horizontalScrollBar().valueChanged.connect(self._reset_hover_rect)
+        self.model().rowsInserted.connect(self._reset_hover_rect)
+        self.model().rowsRemoved.connect(self._reset_hover_rect)
+        self.model().layoutChanged.connect(self._reset_hover_rect)
         
         self.itemEntered.connect(self.on_item_entered)
         # We need to detect when mouse leaves item to stop timer
         # itemEntered triggers when mouse MOVES onto an item.
         
+    def _reset_hover_rect(self, *args):
+        self._hover_rect = QRect()
+
     def on_item_entered(self, item):
+        if item is self.hover_item:
+            return # Already timing this row
         self.hide_preview() # Hide previous if any
         self.hover_item = item
-        self.preview_timer.start(2000) # 2 seconds
+        self.preview_timer.start(2000, self) # 2 seconds
         
     def mouseMoveEvent(self, event):
         super().mouseMoveEvent(event)
         # If we moved, we might need to reset or check if we are still on same item?
         # itemEntered handles switching items.
         # But if we move OUT of an item to whitespace?
-        item = self.itemAt(event.pos())
-        if item != self.hover_item:
+        pos = event.pos()
+        if self._hover_rect.contains(pos):
+            return # Still on the same row, nothing changed
+        item = self.itemAt(pos)
+        self._hover_rect = self.visualItemRect(item) if item else QRect()
+        if item is not self.hover_item:
             self.hover_item = item
             self.hide_preview()
             self.preview_timer.stop()
             if item:
-                self.preview_timer.start(2000)
+                self.preview_timer.start(2000, self)
     
+    def timerEvent(self, event):
+        if event.timerId() == self.preview_timer.timerId():
+            self.preview_timer.stop() # single shot
+            self.show_preview()
+        else:
+            super().timerEvent(event) # the view runs its own timers too
+
     def leaveEvent(self, event):
+        self._hover_rect = QRect()
         self.hide_preview()
         self.preview_timer.stop()
         self.hover_item = None
@@ -61,171 +231,324 @@ class PreviewListWidget(QListWidget):
             return
             
         path = self.hover_item.data(Qt.ItemDataRole.UserRole)
-        if not path or not os.path.exists(path):
+        if not path:
             return
-            
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+
+        # Keyed by mtime and size, so hovering the same file again shows the
+        # cached pixmap at once, and an edited file is decoded again
+        self._preview_key = f"preview:{path}:{st.st_mtime_ns}:{st.st_size}"
+        self._preview_request += 1
+        pixmap = QPixmapCache.find(self._preview_key)
+        if pixmap is not None:
+            self._show_pixmap(pixmap)
+            return
+
+        # Decoding a large file would freeze the list, so hand it to the pool
+        QThreadPool.globalInstance().start(PreviewLoader(self._preview_request, path, st.st_mtime_ns, st.st_size, self._preview_signals))
+
+    def on_preview_ready(self, request_id, image):
+        # Superseded by a newer hover, or the cursor already left
+        if request_id != self._preview_request or not self.hover_item or image.isNull():
+            return
+
+        # QPixmap has to be created on the GUI thread
+        pixmap = QPixmap.fromImage(image)
+        QPixmapCache.insert(self._preview_key, pixmap)
+        self._show_pixmap(pixmap)
+
+    def _show_pixmap(self, pixmap):
         # Create Popup
         if self.preview_label is None:
-            self.preview_label = QLabel(self, windowFlags=Qt.WindowType.ToolTip)
+            self.preview_label = QLabel(self, Qt.WindowType.ToolTip)
             self.preview_label.setStyleSheet("border: 2px solid #333; background: white;")
             self.preview_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         
-        # Load and scale image
-        try:
-            pixmap = QPixmap(path)
-            if not pixmap.isNull():
-                scaled = pixmap.scaled(200, 200, Qt.AspectRatioMode.KeepAspectRatio)
-                self.preview_label.setPixmap(scaled)
-                self.preview_label.adjustSize()
-                
-                # Position near cursor
-                pos = QCursor.pos()
-                self.preview_label.move(pos.x() + 20, pos.y() + 20)
-                self.preview_label.show()
-        except Exception:
-            pass
+        self.preview_label.setPixmap(pixmap)
+        self.preview_label.adjustSize()
+        
+        # Position near cursor
+        pos = QCursor.pos()
+        self.preview_label.move(pos.x() + 20, pos.y() + 20)
+        self.preview_label.show()
 
     def hide_preview(self):
+        # Drop any decode still in flight
+        self._preview_request += 1
         if self.preview_label:
             self.preview_label.hide()
 
-class StitcherThread(QThread):
+@dataclass(frozen=True)
+class StitchConfig:
+    """Stitch settings read from the merge tab, built once per click."""
+    output_dir: str
+    split_count: int
+    target_width: Optional[int]
+    max_kb: int
+    mode: str = 'vertical'
+    rows: Optional[int] = None
+    cols: Optional[int] = None
+    output_format: str = 'AUTO'
+    custom_name: Optional[str] = None
+
+@dataclass(frozen=True)
+class SliceConfig:
+    """Slice settings read from the slice tab, built once per click."""
+    output_dir: str
+    count: int
+    smart_mode: bool
+    target_width: Optional[int]
+    max_kb: int
+    direction: str = 'horizontal'
+    rows: Optional[int] = None
+    cols: Optional[int] = None
+    output_format: str = 'AUTO'
+    custom_name: Optional[str] = None
+
+class WorkerSignals(QObject):
+    # QRunnable is not a QObject, so pooled tasks carry their signals here
     finished_signal = pyqtSignal(bool, str)
+    progress_signal = pyqtSignal(int, int) # (done, total), throttled by the task
+
+def _progress_step(total):
+    """Report progress about 50 times per batch, not once per file."""
+    return max(1, total // 50)
+
+def _iter_dropped_dir(root, valid_extensions):
+    """
+    Yield the files under root whose extension is in valid_extensions, in
+    os.walk order (a folder's files before its subfolders, symlinked folders
+    not followed). DirEntry types come from the directory listing itself.
+    """
+    try:
+        with os.scandir(root) as it:
+            entries = list(it)
+    except OSError:
+        return # Unreadable folder, skipped like os.walk does
+    subdirs = []
+    for entry in entries:
+        try:
+            if entry.is_dir():
+                if not entry.is_symlink():
+                    subdirs.append(entry.path)
+            elif os.path.splitext(entry.name)[1].lower() in valid_extensions:
+                yield entry.path
+        except OSError:
+            continue
+    for subdir in subdirs:
+        yield from _iter_dropped_dir(subdir, valid_extensions)
+
+def _iter_dropped(paths, valid_extensions):
+    """
+    Yield the dropped files, and the files inside dropped folders (scanned
+    recursively), whose extension is in valid_extensions.
+    """
+    for path in paths:
+        # Only the extension is lower-cased, then a set lookup; it is checked
+        # before isfile() so rejected files never cost a stat
+        if os.path.splitext(path)[1].lower() in valid_extensions and os.path.isfile(path):
+            yield path
+        elif os.path.isdir(path):
+            yield from _iter_dropped_dir(path, valid_extensions)
+
+def _collect_dropped(paths, valid_extensions):
+    """List form of _iter_dropped, built in one pass."""
+    return list(_iter_dropped(paths, valid_extensions))
+
+class FolderScanSignals(QObject):
+    # (tab index at drop time, collected files)
+    scanned_signal = pyqtSignal(int, list)
+
+class FolderScanTask(QRunnable):
+    def __init__(self, paths, valid_extensions, tab_index, signals):
+        super().__init__()
+        self.paths = paths
+        self.valid_extensions = valid_extensions
+        self.tab_index = tab_index
+        self.signals = signals
+
+    def run(self):
+        try:
+            new_files = _collect_dropped(self.paths, self.valid_extensions)
+        except OSError:
+            new_files = []
+        self.signals.scanned_signal.emit(self.tab_index, new_files)
 
-    def __init__(self, image_paths, output_dir, split_count, target_width, max_kb, mode='vertical', rows=2, cols=2, output_format='AUTO', custom_name=None):
+class StitcherTask(QRunnable):
+    def __init__(self, image_paths, config):
         super().__init__()
+        self.signals = WorkerSignals()
         self.image_paths = image_paths
-        self.output_dir = output_dir
-        self.split_count = split_count
-        self.target_width = target_width
-        self.max_kb = max_kb
-        self.target_width = target_width
-        self.max_kb = max_kb
-        self.mode = mode
-        self.rows = rows
-        self.cols = cols
-        self.output_format = output_format
-        self.custom_name = custom_name
+        self.config = config
 
     def run(self):
         try:
-            success, message = stitch_images(self.image_paths, self.output_dir, self.split_count, self.target_width, self.max_kb, self.mode, self.rows, self.cols, self.output_format, self.custom_name)
-            self.finished_signal.emit(success, message)
+            from stitcher import stitch_images
+            c = self.config
+            success, message = stitch_images(self.image_paths, c.output_dir, c.split_count, c.target_width, c.max_kb, c.mode, c.rows, c.cols, c.output_format, c.custom_name)
+            self.signals.finished_signal.emit(success, message)
         except Exception as e:
-            self.finished_signal.emit(False, str(e))
-
-class MergerThread(QThread):
-    finished_signal = pyqtSignal(bool, str)
+            self.signals.finished_signal.emit(False, str(e))
 
+class MergerTask(QRunnable):
     def __init__(self, image_paths, output_path, max_kb):
         super().__init__()
+        self.signals = WorkerSignals()
         self.image_paths = image_paths
         self.output_path = output_path
         self.max_kb = max_kb
 
     def run(self):
         try:
+            from merger import merge_images_to_pdf
             success, message = merge_images_to_pdf(self.image_paths, self.output_path, self.max_kb)
-            self.finished_signal.emit(success, message)
+            self.signals.finished_signal.emit(success, message)
         except Exception as e:
-            self.finished_signal.emit(False, str(e))
-
-class ConverterThread(QThread):
-    finished_signal = pyqtSignal(bool, str)
+            self.signals.finished_signal.emit(False, str(e))
 
-    def __init__(self, file_paths, output_dir, output_format):
+class ConverterTask(QRunnable):
+    def __init__(self, file_paths, output_dir, output_format, dpi=150):
         super().__init__()
+        self.signals = WorkerSignals()
         self.file_paths = file_paths
         self.output_dir = output_dir
         self.output_format = output_format
+        self.dpi = dpi
 
     def run(self):
         success_count = 0
         fail_count = 0
-        details = ""
 
         try:
-            for path in self.file_paths:
-                ext = os.path.splitext(path)[1].lower()
-                res = False
-                msg = ""
-                
-                if ext == '.pdf':
-                    res, msg = convert_pdf_to_images(path, self.output_dir, self.output_format)
-                elif ext == '.psd':
-                    res, msg = convert_psd_to_images(path, self.output_dir, self.output_format)
-                elif ext in ['.ppt', '.pptx']:
-                    res, msg = convert_ppt_to_images(path, self.output_dir, self.output_format)
-                else:
-                    msg = "Unsupported format"
-                
-                if res:
-                    success_count += 1
-                    details += f"\n[成功] {os.path.basename(path)}: {msg}"
-                else:
-                    fail_count += 1
-                    details += f"\n[失败] {os.path.basename(path)}: {msg}"
-
-            final_msg = f"处理完成: 成功 {success_count} 个, 失败 {fail_count} 个。\n{details}"
-            self.finished_signal.emit(fail_count == 0, final_msg)
+            from converter import convert_file
+            # Files are independent and the heavy work (MuPDF in the process
+            # pool, PowerPoint, Pillow encode) happens outside the GIL
+            names = [_split_path(path).basename for path in self.file_paths]
+            details = [None] * len(self.file_paths) # filled by index to keep list order
+            total = len(self.file_paths)
+            step = _progress_step(total)
+            max_workers = max(1, min(8, os.cpu_count() or 1, total))
+            with ThreadPoolExecutor(max_workers=max_workers) as ex:
+                futures = {ex.submit(convert_file, path, self.output_dir, self.output_format, self.dpi): i
+                           for i, path in enumerate(self.file_paths)}
+                for done, future in enumerate(as_completed(futures), 1):
+                    i = futures[future]
+                    res, msg = future.result()
+                    if res:
+                        success_count += 1
+                        details[i] = f"[成功] {names[i]}: {msg}"
+                    else:
+                        fail_count += 1
+                        details[i] = f"[失败] {names[i]}: {msg}"
+                    if done % step == 0 or done == total:
+                        self.signals.progress_signal.emit(done, total)
+
+            # Blank line between the summary and the per-file details
+            final_msg = "\n".join([f"处理完成: 成功 {success_count} 个, 失败 {fail_count} 个。", ""] + details)
+            self.signals.finished_signal.emit(fail_count == 0, final_msg)
 
         except Exception as e:
-            self.finished_signal.emit(False, str(e))
-
-class SlicerThread(QThread):
-    finished_signal = pyqtSignal(bool, str)
+            self.signals.finished_signal.emit(False, str(e))
 
-    def __init__(self, image_paths, output_dir, count, smart_mode, target_width, max_kb, direction='horizontal', rows=None, cols=None, output_format='AUTO', custom_name=None):
+class SlicerTask(QRunnable):
+    def __init__(self, image_paths, config):
         super().__init__()
+        self.signals = WorkerSignals()
         self.image_paths = image_paths
-        self.output_dir = output_dir
-        self.count = count
-        self.smart_mode = smart_mode
-        self.target_width = target_width
-        self.max_kb = max_kb
-        self.direction = direction
-        self.rows = rows
-        self.cols = cols
-        self.output_format = output_format
-        self.custom_name = custom_name
+        self.config = config
 
     def run(self):
         success = True
-        message = ""
         try:
+            from slicer import slice_one
+            from utils import get_process_pool
+            c = self.config
+            max_kb_val = c.max_kb if c.max_kb > 0 else None
+            # Each image is sliced in a worker process: smart-cut search is
+            # pure Python, so threads would serialize on the GIL.
+            pool = get_process_pool()
+            futures = {}
             for i, img_path in enumerate(self.image_paths):
                 # Handle custom name for multiple files?
                 # If custom name is "MyPic", multiple input files might conflict or need indexing.
                 # Let's assume custom_name applies mainly to single file slicing or prefixing.
                 # If multiple files, we probably should append index to folder name or similar.
                 
-                c_name = self.custom_name
+                c_name = c.custom_name
                 if c_name and len(self.image_paths) > 1:
                      c_name = f"{c_name}_{i+1}"
-                     
-                if self.direction == 'grid':
-                    max_kb_val = self.max_kb if self.max_kb > 0 else None
-                    s, m = slice_grid_image(img_path, self.output_dir, self.rows, self.cols, self.target_width, max_kb_val, self.output_format, c_name)
-                else:
-                    max_kb_val = self.max_kb if self.max_kb > 0 else None
-                    s, m = slice_image(img_path, self.output_dir, self.count, self.smart_mode, self.target_width, max_kb_val, self.direction, self.output_format, c_name)
                 
+                future = pool.submit(slice_one, img_path, c.output_dir, c.count, c.smart_mode,
+                                     c.target_width, max_kb_val, c.direction, c.rows, c.cols,
+                                     c.output_format, c_name)
+                futures[future] = i
+            
+            # Results arrive in completion order; slot them by input index
+            # so the message lists images in the order the user added them.
+            # Lines are collected and joined once, not grown string by string.
+            parts = [None] * len(futures)
+            total = len(futures)
+            step = _progress_step(total)
+            for done, future in enumerate(as_completed(futures), 1):
+                img_path, s, m = future.result()
                 if not s:
                     success = False
-                    message += f"\nFailed {os.path.basename(img_path)}: {m}"
+                    parts[futures[future]] = f"Failed {_split_path(img_path).basename}: {m}"
                 else:
-                    message += f"\nProcessed {os.path.basename(img_path)}: {m}"
+                    parts[futures[future]] = f"Processed {_split_path(img_path).basename}: {m}"
+                if done % step == 0 or done == total:
+                    self.signals.progress_signal.emit(done, total)
+        
+            header = "All images processed successfully!" if success else "Some images failed."
+            message = "\n".join([header] + parts)
             
-            if success:
-                message = "All images processed successfully!" + message
-            else:
-                message = "Some images failed." + message
-                
-            self.finished_signal.emit(success, message)
+            # Emitted from run() only, never from a pool worker
+            self.signals.finished_signal.emit(success, message)
         except Exception as e:
-            self.finished_signal.emit(False, str(e))
+            self.signals.finished_signal.emit(False, str(e))
 
 class ImageMatrixApp(QMainWindow):
+    # Accepted drop extensions (lower-case, with dot)
+    _IMAGE_EXTS = frozenset({'.jpg', '.jpeg', '.png', '.pdf'})
+    _CONVERT_EXTS = frozenset({'.pdf', '.psd', '.ppt', '.pptx'})
+
+    # Grid preset buttons, one tuple per row: (label, rows, cols, button width)
+    _GRID_PRESETS = (
+        (("2x2", 2, 2, 50), ("3x3", 3, 3, 50), ("4x4", 4, 4, 50), ("5x5", 5, 5, 50)),
+        # Longer labels get wider buttons
+        (("32x32", 32, 32, 65), ("128x128", 128, 128, 65), ("512x512", 512, 512, 65), ("1024x1024", 1024, 1024, 80)),
+    )
+
+    # Shared stylesheets for the drop areas and option groups
+    _DROP_STYLE = """
+            QLabel {
+                border: 2px dashed #aaa;
+                border-radius: 10px;
+                padding: 15px;
+                font-size: 14px;
+                color: #555;
+                background-color: #f0f0f0;
+            }
+        """
+
+    _GROUP_STYLE = """
+            QGroupBox {
+                border: 1px solid #d0d0d0;
+                border-radius: 5px;
+                margin-top: 10px;
+                padding-top: 10px;
+            }
+            QGroupBox::title {
+                subcontrol-origin: margin;
+                subcontrol-position: top left;
+                padding: 0 3px;
+                color: #555;
+            }
+        """
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("ImageMatrix (影像矩阵) - 拼图 & 切图工具")
@@ -233,20 +556,58 @@ class ImageMatrixApp(QMainWindow):
         
         # Data storage
         self.merge_images = []
+        # False once a rename may have broken merge_images' sort_key order
+        self._merge_sorted = True
         self.slice_images = []
         # Store full items in the widget for combine tab to support reordering
         # But we still need a list to track dropping? 
         # Actually for combine tab we update the widget directly with UserRole
         
-        self.stitch_thread = None
-        self.slicer_thread = None
-        self.merger_thread = None
-        self.converter_thread = None
+        # Queued/running tasks of every tab, referenced until they report back
+        self._running_jobs = set()
+        self._stitch_running = 0
+        self._slice_running = 0
+
+        # Stitch/slice/merge/convert jobs run side by side, one thread per
+        # core at most, so the user can queue more while earlier ones are
+        # still working; the heavy lifting inside each job fans out to the
+        # process pool or the job's own threads. The GUI thread only
+        # dispatches tasks and receives their signals.
+        self._job_pool = QThreadPool(self)
+        self._job_pool.setMaxThreadCount(os.cpu_count() or 4)
+        self._job_pool.setExpiryTimeout(-1) # keep threads parked between jobs
         
         self.convert_files = []
 
+        # Membership sets kept in step with the path lists above, so drops
+        # dedupe in O(new files) without rehashing what is already accepted
+        self._merge_set = set()
+        self._slice_set = set()
+        self._convert_set = set()
+
+        # Dropped folders are walked on the thread pool; results come back here
+        self._scan_signals = FolderScanSignals(self)
+        self._scan_signals.scanned_signal.connect(self._on_files_collected)
+
+        # Shared input validators (a validator can serve any number of line edits)
+        self._validator_20000 = QIntValidator(1, 20000, self) # widths in px, limits in KB
+        self._validator_5000 = QIntValidator(1, 5000, self) # grid rows / cols
+
+        # Slider label refreshes are coalesced to at most one per frame
+        self._pending_slider_updates = {}
+        self._slider_timer = QTimer(self)
+        self._slider_timer.setSingleShot(True)
+        self._slider_timer.setInterval(16)
+        self._slider_timer.timeout.connect(self._flush_slider_updates)
+
         self.initUI()
 
+        # (radio, value) tables for _checked_choice, built once instead of per click
+        self._stitch_mode_table = ((self.m_radio_h, 'horizontal'), (self.m_radio_grid, 'grid'))
+        self._stitch_fmt_table = ((self.m_radio_fmt_jpg, 'JPG'), (self.m_radio_fmt_png, 'PNG'), (self.m_radio_fmt_pdf, 'PDF'))
+        self._slice_mode_table = ((self.s_radio_v, 'vertical'), (self.s_radio_grid, 'grid'))
+        self._slice_fmt_table = ((self.s_radio_fmt_jpg, 'JPG'), (self.s_radio_fmt_png, 'PNG'), (self.s_radio_fmt_pdf, 'PDF'))
+
     def initUI(self):
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
@@ -285,7 +646,7 @@ class ImageMatrixApp(QMainWindow):
         # Drop Label
         self.merge_drop_label = QLabel("请将图片拖拽到此处\n(支持 .jpg, .jpeg, .png, .pdf)")
         self.merge_drop_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.merge_drop_label.setStyleSheet(self._get_drop_style())
+        self.merge_drop_label.setStyleSheet(self._DROP_STYLE)
         layout.addWidget(self.merge_drop_label)
 
         # List Widget
@@ -298,7 +659,7 @@ class ImageMatrixApp(QMainWindow):
 
         # Size Selection
         size_group = QGroupBox("导出宽度选择")
-        size_group.setStyleSheet(self._get_group_style())
+        size_group.setStyleSheet(self._GROUP_STYLE)
         size_layout = QHBoxLayout()
         
         self.m_radio_original = QRadioButton("原图")
@@ -309,17 +670,11 @@ class ImageMatrixApp(QMainWindow):
         self.m_radio_custom = QRadioButton("自定义")
         self.m_custom_input = QLineEdit()
         self.m_custom_input.setPlaceholderText("宽度")
-        self.m_custom_input.setValidator(QIntValidator(1, 20000))
+        self.m_custom_input.setValidator(self._validator_20000)
         self.m_custom_input.setFixedWidth(60)
         self.m_custom_input.setEnabled(False)
         self.m_radio_custom.toggled.connect(lambda c: self.m_custom_input.setEnabled(c))
         
-        m_size_btn_group = QButtonGroup(self.merge_tab)
-        m_size_btn_group.addButton(self.m_radio_original)
-        m_size_btn_group.addButton(self.m_radio_750)
-        m_size_btn_group.addButton(self.m_radio_1080)
-        m_size_btn_group.addButton(self.m_radio_custom)
-        
         size_layout.addWidget(self.m_radio_original)
         size_layout.addWidget(self.m_radio_750)
         size_layout.addWidget(self.m_radio_1080)
@@ -330,7 +685,7 @@ class ImageMatrixApp(QMainWindow):
 
         # Export Format Selection
         format_group = QGroupBox("导出格式")
-        format_group.setStyleSheet(self._get_group_style())
+        format_group.setStyleSheet(self._GROUP_STYLE)
         format_layout = QHBoxLayout()
         
         self.m_radio_fmt_auto = QRadioButton("自动 (默认)")
@@ -339,12 +694,6 @@ class ImageMatrixApp(QMainWindow):
         self.m_radio_fmt_pdf = QRadioButton("PDF")
         self.m_radio_fmt_auto.setChecked(True)
         
-        m_fmt_group = QButtonGroup(self.merge_tab)
-        m_fmt_group.addButton(self.m_radio_fmt_auto)
-        m_fmt_group.addButton(self.m_radio_fmt_jpg)
-        m_fmt_group.addButton(self.m_radio_fmt_png)
-        m_fmt_group.addButton(self.m_radio_fmt_pdf)
-        
         format_layout.addWidget(self.m_radio_fmt_auto)
         format_layout.addWidget(self.m_radio_fmt_jpg)
         format_layout.addWidget(self.m_radio_fmt_png)
@@ -354,7 +703,7 @@ class ImageMatrixApp(QMainWindow):
 
         # Mode Selection (New)
         mode_group = QGroupBox("拼接模式")
-        mode_group.setStyleSheet(self._get_group_style())
+        mode_group.setStyleSheet(self._GROUP_STYLE)
         mode_layout = QVBoxLayout()
         
         mode_btn_layout = QHBoxLayout()
@@ -363,11 +712,6 @@ class ImageMatrixApp(QMainWindow):
         self.m_radio_grid = QRadioButton("宫格拼接")
         self.m_radio_v.setChecked(True)
         
-        m_mode_group = QButtonGroup(self.merge_tab)
-        m_mode_group.addButton(self.m_radio_v)
-        m_mode_group.addButton(self.m_radio_h)
-        m_mode_group.addButton(self.m_radio_grid)
-        
         mode_btn_layout.addWidget(self.m_radio_v)
         mode_btn_layout.addWidget(self.m_radio_h)
         mode_btn_layout.addWidget(self.m_radio_grid)
@@ -383,38 +727,18 @@ class ImageMatrixApp(QMainWindow):
         presets_label = QLabel("快速预设:")
         grid_layout.addWidget(presets_label)
         
-        # Row 1
-        presets_layout = QHBoxLayout()
-        presets = [("2x2", 2, 2), ("3x3", 3, 3), ("4x4", 4, 4), ("5x5", 5, 5)]
-        for label, r, c in presets:
-            btn = QPushButton(label)
-            btn.setFixedWidth(50)
-            btn.clicked.connect(lambda checked, r=r, c=c: self.set_merge_grid_val(r, c))
-            presets_layout.addWidget(btn)
-        presets_layout.addStretch()
-        grid_layout.addLayout(presets_layout)
-
-        # Row 2
-        presets_layout_2 = QHBoxLayout()
-        presets2 = [("32x32", 32, 32), ("128x128", 128, 128), ("512x512", 512, 512), ("1024x1024", 1024, 1024)]
-        for label, r, c in presets2:
-            btn = QPushButton(label)
-            width = 80 if "1024" in label else 65
-            btn.setFixedWidth(width)
-            btn.clicked.connect(lambda checked, r=r, c=c: self.set_merge_grid_val(r, c))
-            presets_layout_2.addWidget(btn)
-        presets_layout_2.addStretch()
-        grid_layout.addLayout(presets_layout_2)
+        # Row 1: 2x2 .. 5x5, Row 2: 32x32 .. 1024x1024
+        self._add_grid_presets(grid_layout, self._on_merge_grid_preset)
 
         # Custom Input
         custom_grid_layout = QHBoxLayout()
         custom_grid_layout.addWidget(QLabel("自定义:"))
         self.m_grid_rows = QLineEdit()
         self.m_grid_rows.setPlaceholderText("行")
-        self.m_grid_rows.setValidator(QIntValidator(1, 5000))
+        self.m_grid_rows.setValidator(self._validator_5000)
         self.m_grid_cols = QLineEdit()
         self.m_grid_cols.setPlaceholderText("列")
-        self.m_grid_cols.setValidator(QIntValidator(1, 5000))
+        self.m_grid_cols.setValidator(self._validator_5000)
         
         custom_grid_layout.addWidget(self.m_grid_rows)
         custom_grid_layout.addWidget(QLabel("x"))
@@ -432,56 +756,12 @@ class ImageMatrixApp(QMainWindow):
         self.m_radio_grid.toggled.connect(self.update_merge_ui_text)
 
         # File Size Limit Selection
-        # File Size Limit Selection
-        limit_group = QGroupBox("图片大小限制 (KB)")
-        limit_group.setStyleSheet(self._get_group_style())
-        limit_layout = QVBoxLayout()
-        
-        # New Limit UI with Radio Buttons
-        self.m_radio_limit_preset = QRadioButton("预设: 150 KB")
-        self.m_radio_limit_preset.setChecked(True)
-        self.m_limit_slider = QSlider(Qt.Orientation.Horizontal)
-        self.m_limit_slider.setMinimum(0)
-        self.m_limit_slider.setMaximum(5) # 0:Unlimited, 1:150, 2:300, 3:500, 4:750, 5:1000
-        self.m_limit_slider.setValue(1)
-        self.m_limit_slider.setTickPosition(QSlider.TickPosition.TicksBelow)
-        self.m_limit_slider.setTickInterval(1)
-        self.m_limit_slider.valueChanged.connect(lambda v: self.update_limit_label(v, self.m_radio_limit_preset))
-        
-        # When slider interacts, auto-check preset radio
-        self.m_limit_slider.sliderPressed.connect(lambda: self.m_radio_limit_preset.setChecked(True))
-        
-        self.m_radio_limit_custom = QRadioButton("自定义:")
-        self.m_limit_custom_input = QLineEdit()
-        self.m_limit_custom_input.setPlaceholderText("KB")
-        self.m_limit_custom_input.setValidator(QIntValidator(1, 20000))
-        self.m_limit_custom_input.setFixedWidth(60)
-        self.m_limit_custom_input.setEnabled(False)
-        self.m_radio_limit_custom.toggled.connect(lambda c: self.m_limit_custom_input.setEnabled(c))
-        
-        limit_btn_group = QButtonGroup(self.merge_tab)
-        limit_btn_group.addButton(self.m_radio_limit_preset)
-        limit_btn_group.addButton(self.m_radio_limit_custom)
-        
-        # Layout row 1: Radio + Slider
-        row1 = QHBoxLayout()
-        row1.addWidget(self.m_radio_limit_preset)
-        row1.addWidget(self.m_limit_slider)
-        
-        # Layout row 2: Radio + Input
-        row2 = QHBoxLayout()
-        row2.addWidget(self.m_radio_limit_custom)
-        row2.addWidget(self.m_limit_custom_input)
-        row2.addStretch()
-        
-        limit_layout.addLayout(row1)
-        limit_layout.addLayout(row2)
-        limit_group.setLayout(limit_layout)
+        limit_group, self.m_radio_limit_preset, self.m_limit_slider, self.m_radio_limit_custom, self.m_limit_custom_input = self._build_limit_group('m_limit')
         controls_layout.addWidget(limit_group)
 
         # Split Selection
         self.m_split_group = QGroupBox("分组拼接设置")
-        self.m_split_group.setStyleSheet(self._get_group_style())
+        self.m_split_group.setStyleSheet(self._GROUP_STYLE)
         split_layout = QVBoxLayout()
         self.m_split_label = QLabel("拼接成：1 张长图")
         self.m_split_slider = QSlider(Qt.Orientation.Horizontal)
@@ -498,7 +778,7 @@ class ImageMatrixApp(QMainWindow):
 
         # Filename Input (New)
         name_group = QGroupBox("导出文件名 (选填)")
-        name_group.setStyleSheet(self._get_group_style())
+        name_group.setStyleSheet(self._GROUP_STYLE)
         name_layout = QHBoxLayout()
         self.m_name_input = QLineEdit()
         self.m_name_input.setPlaceholderText("默认为自动生成的日期时间戳")
@@ -528,7 +808,7 @@ class ImageMatrixApp(QMainWindow):
         # Drop Label
         self.slice_drop_label = QLabel("请将图片拖拽到此处")
         self.slice_drop_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.slice_drop_label.setStyleSheet(self._get_drop_style())
+        self.slice_drop_label.setStyleSheet(self._DROP_STYLE)
         layout.addWidget(self.slice_drop_label)
 
         # List Widget
@@ -540,7 +820,7 @@ class ImageMatrixApp(QMainWindow):
 
         # 1. Width Selection (Full Row)
         size_group = QGroupBox("导出宽度")
-        size_group.setStyleSheet(self._get_group_style())
+        size_group.setStyleSheet(self._GROUP_STYLE)
         size_layout = QHBoxLayout()
         
         self.s_radio_original = QRadioButton("原图")
@@ -549,15 +829,11 @@ class ImageMatrixApp(QMainWindow):
         
         self.s_custom_input = QLineEdit()
         self.s_custom_input.setPlaceholderText("例如 750")
-        self.s_custom_input.setValidator(QIntValidator(1, 20000))
+        self.s_custom_input.setValidator(self._validator_20000)
         self.s_custom_input.setFixedWidth(60)
         self.s_custom_input.setEnabled(False)
         self.s_radio_custom.toggled.connect(lambda c: self.s_custom_input.setEnabled(c))
 
-        s_size_btn_group = QButtonGroup(self.slice_tab)
-        s_size_btn_group.addButton(self.s_radio_original)
-        s_size_btn_group.addButton(self.s_radio_custom)
-
         size_layout.addWidget(self.s_radio_original)
         size_layout.addWidget(self.s_radio_custom)
         size_layout.addWidget(self.s_custom_input)
@@ -567,7 +843,7 @@ class ImageMatrixApp(QMainWindow):
 
         # 2. Export Format Selection (New)
         format_group = QGroupBox("导出格式")
-        format_group.setStyleSheet(self._get_group_style())
+        format_group.setStyleSheet(self._GROUP_STYLE)
         format_layout = QHBoxLayout()
         
         self.s_radio_fmt_auto = QRadioButton("自动 (默认)")
@@ -576,12 +852,6 @@ class ImageMatrixApp(QMainWindow):
         self.s_radio_fmt_pdf = QRadioButton("PDF")
         self.s_radio_fmt_auto.setChecked(True)
         
-        s_fmt_group = QButtonGroup(self.slice_tab)
-        s_fmt_group.addButton(self.s_radio_fmt_auto)
-        s_fmt_group.addButton(self.s_radio_fmt_jpg)
-        s_fmt_group.addButton(self.s_radio_fmt_png)
-        s_fmt_group.addButton(self.s_radio_fmt_pdf)
-        
         format_layout.addWidget(self.s_radio_fmt_auto)
         format_layout.addWidget(self.s_radio_fmt_jpg)
         format_layout.addWidget(self.s_radio_fmt_png)
@@ -589,52 +859,13 @@ class ImageMatrixApp(QMainWindow):
         format_group.setLayout(format_layout)
         controls_layout.addWidget(format_group)
 
-        # 2. Limit (Group Box style similar to Merge Tab)
-        limit_group = QGroupBox("图片大小限制 (KB)")
-        limit_group.setStyleSheet(self._get_group_style())
-        limit_layout = QVBoxLayout()
-
-        self.s_radio_limit_preset = QRadioButton("预设: 150 KB")
-        self.s_radio_limit_preset.setChecked(True)
-        self.s_limit_slider = QSlider(Qt.Orientation.Horizontal)
-        self.s_limit_slider.setMinimum(0)
-        self.s_limit_slider.setMaximum(5)
-        self.s_limit_slider.setValue(1)
-        self.s_limit_slider.setTickPosition(QSlider.TickPosition.TicksBelow)
-        self.s_limit_slider.setTickInterval(1)
-        self.s_limit_slider.valueChanged.connect(lambda v: self.update_limit_label(v, self.s_radio_limit_preset))
-        self.s_limit_slider.sliderPressed.connect(lambda: self.s_radio_limit_preset.setChecked(True))
-
-        self.s_radio_limit_custom = QRadioButton("自定义:")
-        self.s_limit_custom_input = QLineEdit()
-        self.s_limit_custom_input.setPlaceholderText("KB")
-        self.s_limit_custom_input.setValidator(QIntValidator(1, 20000))
-        self.s_limit_custom_input.setFixedWidth(60)
-        self.s_limit_custom_input.setEnabled(False)
-        self.s_radio_limit_custom.toggled.connect(lambda c: self.s_limit_custom_input.setEnabled(c))
-        
-        s_limit_btn_group = QButtonGroup(self.slice_tab)
-        s_limit_btn_group.addButton(self.s_radio_limit_preset)
-        s_limit_btn_group.addButton(self.s_radio_limit_custom)
-
-        row1 = QHBoxLayout()
-        row1.addWidget(self.s_radio_limit_preset)
-        row1.addWidget(self.s_limit_slider)
-        
-        row2 = QHBoxLayout()
-        row2.addWidget(self.s_radio_limit_custom)
-        row2.addWidget(self.s_limit_custom_input)
-        row2.addStretch()
-        
-        limit_layout.addLayout(row1)
-        limit_layout.addLayout(row2)
-        limit_group.setLayout(limit_layout)
-        
+        # 2. Limit (same group as the Merge Tab)
+        limit_group, self.s_radio_limit_preset, self.s_limit_slider, self.s_radio_limit_custom, self.s_limit_custom_input = self._build_limit_group('s_limit')
         controls_layout.addWidget(limit_group)
 
         # 3. Settings Group
         slice_group = QGroupBox("切图模式 & 设置")
-        slice_group.setStyleSheet(self._get_group_style())
+        slice_group.setStyleSheet(self._GROUP_STYLE)
         slice_inner_layout = QVBoxLayout()
 
         # Direction/Mode Selection
@@ -649,11 +880,6 @@ class ImageMatrixApp(QMainWindow):
         self.s_radio_v.toggled.connect(self.update_slice_ui_text)
         self.s_radio_grid.toggled.connect(self.update_slice_ui_text)
         
-        dir_btn_group = QButtonGroup(self.slice_tab)
-        dir_btn_group.addButton(self.s_radio_h)
-        dir_btn_group.addButton(self.s_radio_v)
-        dir_btn_group.addButton(self.s_radio_grid)
-        
         dir_layout.addWidget(self.s_dir_label)
         dir_layout.addWidget(self.s_radio_h)
         dir_layout.addWidget(self.s_radio_v)
@@ -673,7 +899,7 @@ class ImageMatrixApp(QMainWindow):
         self.s_count_slider.setValue(5)
         self.s_count_slider.setTickPosition(QSlider.TickPosition.TicksBelow)
         self.s_count_slider.setTickInterval(5)
-        self.s_count_slider.valueChanged.connect(self.update_slice_ui_text)
+        self.s_count_slider.valueChanged.connect(lambda v: self._queue_slider_update('s_count', self.update_slice_ui_text))
         
         count_layout.addWidget(self.s_count_label)
         linear_layout.addLayout(count_layout)
@@ -695,39 +921,18 @@ class ImageMatrixApp(QMainWindow):
         presets_label = QLabel("快速预设:")
         grid_layout.addWidget(presets_label)
         
-        # Row 1: 2x2, 3x3, 4x4, 5x5
-        presets_layout = QHBoxLayout()
-        presets = [("2x2", 2, 2), ("3x3", 3, 3), ("4x4", 4, 4), ("5x5", 5, 5)]
-        for label, r, c in presets:
-            btn = QPushButton(label)
-            btn.setFixedWidth(50)
-            btn.clicked.connect(lambda checked, r=r, c=c: self.set_grid_val(r, c))
-            presets_layout.addWidget(btn)
-        presets_layout.addStretch()
-        grid_layout.addLayout(presets_layout)
-
-        # Row 2: 32x32, 128x128, 512x512, 1024x1024
-        presets_layout_2 = QHBoxLayout()
-        presets2 = [("32x32", 32, 32), ("128x128", 128, 128), ("512x512", 512, 512), ("1024x1024", 1024, 1024)]
-        for label, r, c in presets2:
-            btn = QPushButton(label)
-            # Adjust width slightly for longer text
-            width = 80 if "1024" in label else 65
-            btn.setFixedWidth(width)
-            btn.clicked.connect(lambda checked, r=r, c=c: self.set_grid_val(r, c))
-            presets_layout_2.addWidget(btn)
-        presets_layout_2.addStretch()
-        grid_layout.addLayout(presets_layout_2)
+        # Row 1: 2x2, 3x3, 4x4, 5x5; Row 2: 32x32, 128x128, 512x512, 1024x1024
+        self._add_grid_presets(grid_layout, self._on_slice_grid_preset)
 
         # Custom Input
         custom_grid_layout = QHBoxLayout()
         custom_grid_layout.addWidget(QLabel("自定义:"))
         self.s_grid_rows = QLineEdit()
         self.s_grid_rows.setPlaceholderText("行(Rows)")
-        self.s_grid_rows.setValidator(QIntValidator(1, 5000))
+        self.s_grid_rows.setValidator(self._validator_5000)
         self.s_grid_cols = QLineEdit()
         self.s_grid_cols.setPlaceholderText("列(Cols)")
-        self.s_grid_cols.setValidator(QIntValidator(1, 5000))
+        self.s_grid_cols.setValidator(self._validator_5000)
         
         custom_grid_layout.addWidget(self.s_grid_rows)
         custom_grid_layout.addWidget(QLabel("x"))
@@ -748,7 +953,7 @@ class ImageMatrixApp(QMainWindow):
 
         # Filename Input (New)
         name_group = QGroupBox("导出文件名 (选填)")
-        name_group.setStyleSheet(self._get_group_style())
+        name_group.setStyleSheet(self._GROUP_STYLE)
         name_layout = QHBoxLayout()
         self.s_name_input = QLineEdit()
         self.s_name_input.setPlaceholderText("默认为文件夹/原图名")
@@ -782,7 +987,7 @@ class ImageMatrixApp(QMainWindow):
         # Drop Label
         self.combine_drop_label = QLabel("请将文件或文件夹拖拽到此处\n(支持 .jpg, .png, .pdf)\n列表支持拖拽调整顺序")
         self.combine_drop_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.combine_drop_label.setStyleSheet(self._get_drop_style())
+        self.combine_drop_label.setStyleSheet(self._DROP_STYLE)
         layout.addWidget(self.combine_drop_label)
 
         # List Widget
@@ -797,7 +1002,7 @@ class ImageMatrixApp(QMainWindow):
         
         # Sorting Group (New)
         sort_group = QGroupBox("排序 (Sort)")
-        sort_group.setStyleSheet(self._get_group_style())
+        sort_group.setStyleSheet(self._GROUP_STYLE)
         sort_layout = QHBoxLayout()
         
         btn_sort_name_asc = QPushButton("名称 A-Z")
@@ -829,19 +1034,19 @@ class ImageMatrixApp(QMainWindow):
         self.c_limit_slider.setValue(1) # Default to index 1 -> 1MB? Or 0? Let's say 1
         self.c_limit_slider.setTickPosition(QSlider.TickPosition.TicksBelow)
         self.c_limit_slider.setTickInterval(1)
-        self.c_limit_slider.valueChanged.connect(lambda v: self.update_limit_label_new(v, self.c_limit_label))
+        self.c_limit_slider.valueChanged.connect(lambda v: self._queue_slider_update('c_limit', self.update_limit_label_new, v, self.c_limit_label))
         
         limit_layout.addWidget(self.c_limit_label)
         limit_layout.addWidget(self.c_limit_slider)
         
         limit_group = QGroupBox("PDF大小限制 (Compress)")
-        limit_group.setStyleSheet(self._get_group_style())
+        limit_group.setStyleSheet(self._GROUP_STYLE)
         limit_group.setLayout(limit_layout)
         controls_layout.addWidget(limit_group)
 
         # Filename Input
         name_group = QGroupBox("导出文件名 (选填)")
-        name_group.setStyleSheet(self._get_group_style())
+        name_group.setStyleSheet(self._GROUP_STYLE)
         name_layout = QHBoxLayout()
         self.c_name_input = QLineEdit()
         self.c_name_input.setPlaceholderText("默认为 combine_日期.pdf")
@@ -875,7 +1080,7 @@ class ImageMatrixApp(QMainWindow):
         # Drop Label
         self.convert_drop_label = QLabel("请将 PDF / PSD / PPT 文件拖拽到此处")
         self.convert_drop_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.convert_drop_label.setStyleSheet(self._get_drop_style())
+        self.convert_drop_label.setStyleSheet(self._DROP_STYLE)
         layout.addWidget(self.convert_drop_label)
         
         # List
@@ -888,21 +1093,31 @@ class ImageMatrixApp(QMainWindow):
         
         # Format Selection
         format_group = QGroupBox("导出格式")
-        format_group.setStyleSheet(self._get_group_style())
+        format_group.setStyleSheet(self._GROUP_STYLE)
         format_layout = QHBoxLayout()
         
         self.cv_radio_jpg = QRadioButton("JPG (推荐)")
         self.cv_radio_png = QRadioButton("PNG")
         self.cv_radio_jpg.setChecked(True)
         
-        cv_fmt_group = QButtonGroup(self.convert_tab)
-        cv_fmt_group.addButton(self.cv_radio_jpg)
-        cv_fmt_group.addButton(self.cv_radio_png)
-        
         format_layout.addWidget(self.cv_radio_jpg)
         format_layout.addWidget(self.cv_radio_png)
         format_group.setLayout(format_layout)
         controls_layout.addWidget(format_group)
+
+        # PDF Render Resolution
+        dpi_group = QGroupBox("PDF 清晰度")
+        dpi_group.setStyleSheet(self._GROUP_STYLE)
+        dpi_layout = QHBoxLayout()
+
+        self.cv_radio_dpi_150 = QRadioButton("标准 150 DPI (默认)")
+        self.cv_radio_dpi_300 = QRadioButton("高清 300 DPI")
+        self.cv_radio_dpi_150.setChecked(True)
+
+        dpi_layout.addWidget(self.cv_radio_dpi_150)
+        dpi_layout.addWidget(self.cv_radio_dpi_300)
+        dpi_group.setLayout(dpi_layout)
+        controls_layout.addWidget(dpi_group)
         
         layout.addLayout(controls_layout)
         
@@ -925,34 +1140,6 @@ class ImageMatrixApp(QMainWindow):
         self.setup_list_actions(self.convert_list, self.delete_convert_items, lambda: None)
 
 
-    def _get_drop_style(self):
-        return """
-            QLabel {
-                border: 2px dashed #aaa;
-                border-radius: 10px;
-                padding: 15px;
-                font-size: 14px;
-                color: #555;
-                background-color: #f0f0f0;
-            }
-        """
-
-    def _get_group_style(self):
-        return """
-            QGroupBox {
-                border: 1px solid #d0d0d0;
-                border-radius: 5px;
-                margin-top: 10px;
-                padding-top: 10px;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                subcontrol-position: top left;
-                padding: 0 3px;
-                color: #555;
-            }
-        """
-
     def setup_list_actions(self, list_widget, delete_slot, rename_slot):
         list_widget.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         list_widget.customContextMenuRequested.connect(lambda pos: self.show_context_menu(pos, list_widget, delete_slot, rename_slot))
@@ -970,7 +1157,6 @@ class ImageMatrixApp(QMainWindow):
         super().keyPressEvent(event)
 
     def show_context_menu(self, pos, list_widget, delete_slot, rename_slot):
-        from PyQt6.QtWidgets import QMenu
         menu = QMenu(self)
         
         rename_action = menu.addAction("重命名 (Rename)")
@@ -982,45 +1168,62 @@ class ImageMatrixApp(QMainWindow):
         menu.exec(list_widget.mapToGlobal(pos))
 
     def delete_merge_items(self):
-        self._delete_items(self.merge_list, self.merge_images)
+        self._delete_items(self.merge_list, self.merge_images, self._merge_set)
         self.m_split_slider.setMaximum(max(1, len(self.merge_images)))
 
     def delete_slice_items(self):
-        self._delete_items(self.slice_list, self.slice_images)
+        self._delete_items(self.slice_list, self.slice_images, self._slice_set)
 
-    def _delete_items(self, list_widget, data_list):
-        items = list_widget.selectedItems()
-        if not items:
+    @staticmethod
+    def _selected_runs(list_widget):
+        """
+        Selected rows as (start, count) runs of consecutive rows, last run
+        first so removing one run does not shift the ones still to come.
+        """
+        rows = sorted(index.row() for index in list_widget.selectedIndexes())
+        runs = []
+        for _, group in groupby(enumerate(rows), key=lambda p: p[1] - p[0]):
+            group = list(group)
+            runs.append((group[0][1], len(group)))
+        runs.reverse()
+        return runs
+
+    def _delete_items(self, list_widget, data_list, data_set):
+        runs = self._selected_runs(list_widget)
+        if not runs:
             return
         
-        # Build list of rows to delete to handle indices correctly
-        rows_to_delete = sorted([list_widget.row(item) for item in items], reverse=True)
-        
-        for row in rows_to_delete:
-            del data_list[row]
-            list_widget.takeItem(row)
+        # One model mutation per contiguous block instead of one takeItem per row
+        model = list_widget.model()
+        list_widget.setUpdatesEnabled(False)
+        try:
+            for start, count in runs:
+                data_set.difference_update(data_list[start:start + count])
+                del data_list[start:start + count]
+                model.removeRows(start, count)
+        finally:
+            list_widget.setUpdatesEnabled(True)
 
     def rename_merge_items(self):
-        self._rename_items(self.merge_list, self.merge_images)
+        self._rename_items(self.merge_list, self.merge_images, self._merge_set)
+        # Renamed files keep their row until the next drop re-sorts the list
+        self._merge_sorted = False
 
     def rename_slice_items(self):
-        self._rename_items(self.slice_list, self.slice_images)
+        self._rename_items(self.slice_list, self.slice_images, self._slice_set)
 
-    def _rename_items(self, list_widget, data_list):
+    def _rename_items(self, list_widget, data_list, data_set):
         items = list_widget.selectedItems()
         if not items:
             return
 
-        from PyQt6.QtWidgets import QInputDialog
-        
         # Single Item Rename
         if len(items) == 1:
             item = items[0]
             row = list_widget.row(item)
             old_path = data_list[row]
-            old_name = os.path.basename(old_path)
-            old_dir = os.path.dirname(old_path)
-            name_only, ext = os.path.splitext(old_name)
+            entry = _split_path(old_path)
+            old_dir, name_only, ext = entry.dirname, entry.stem, entry.ext
             
             new_name_only, ok = QInputDialog.getText(self, "重命名", "请输入新文件名:", text=name_only)
             if ok and new_name_only:
@@ -1030,6 +1233,8 @@ class ImageMatrixApp(QMainWindow):
                 try:
                     os.rename(old_path, new_path)
                     data_list[row] = new_path
+                    data_set.discard(old_path)
+                    data_set.add(new_path)
                     item.setText(new_name)
                 except OSError as e:
                     QMessageBox.warning(self, "错误", f"重命名失败: {e}")
@@ -1040,23 +1245,119 @@ class ImageMatrixApp(QMainWindow):
             if ok and base_name:
                 # Sort items by row to maintain order
                 rows = sorted([list_widget.row(item) for item in items])
+                # Keep renaming the rest on errors; all failures are reported
+                # in one dialog instead of a blocking popup per file.
+                failures = []
                 
+                # Phase 1: park every selected file under a unique temporary
+                # name, so names held by files in this batch can be reused
+                # (e.g. re-running a rename over b_001, b_002, ...)
+                tag = f".renaming_{uuid.uuid4().hex}"
+                parked = []
                 for i, row in enumerate(rows):
                     old_path = data_list[row]
-                    old_dir = os.path.dirname(old_path)
-                    _, ext = os.path.splitext(old_path)
-                    
-                    new_name = f"{base_name}_{i+1:03d}{ext}"
-                    new_path = os.path.join(old_dir, new_name)
-                    
+                    entry = _split_path(old_path)
+                    new_name = f"{base_name}_{i+1:03d}{entry.ext}"
                     try:
-                        os.rename(old_path, new_path)
+                        os.rename(old_path, old_path + tag)
+                        parked.append((row, old_path, new_name, os.path.join(entry.dirname, new_name)))
+                    except OSError as e:
+                        failures.append((entry.basename, e.strerror or str(e)))
+                
+                # Phase 2: move to the final names, never over a file outside the batch
+                list_widget.setUpdatesEnabled(False)
+                try:
+                    for row, old_path, new_name, new_path in parked:
+                        tmp_path = old_path + tag
+                        try:
+                            if os.path.exists(new_path):
+                                raise FileExistsError(errno.EEXIST, "目标文件已存在")
+                            os.rename(tmp_path, new_path)
+                        except OSError as e:
+                            failures.append((_split_path(old_path).basename, f"{e.strerror or e} ({new_name})"))
+                            try:
+                                os.rename(tmp_path, old_path)
+                                continue
+                            except OSError:
+                                # Could not restore the old name; track the file where it is
+                                new_path = tmp_path
+                                new_name = _split_path(tmp_path).basename
                         data_list[row] = new_path
+                        data_set.discard(old_path)
+                        data_set.add(new_path)
                         list_widget.item(row).setText(new_name)
-                    except OSError as e:
-                         # Continue renaming others even if one fails? Or stop? 
-                         # Usually stop to avoid mess, but warning is good.
-                         QMessageBox.warning(self, "错误", f"文件 {os.path.basename(old_path)} 重命名失败: {e}")
+                finally:
+                    list_widget.setUpdatesEnabled(True)
+                
+                if failures:
+                    # Details go in the expandable, scrollable section so long lists stay usable
+                    box = QMessageBox(QMessageBox.Icon.Warning, "错误", f"{len(failures)} 个文件重命名失败", parent=self)
+                    box.setDetailedText("\n".join(f"{name}: {msg}" for name, msg in failures))
+                    box.exec()
+
+    def _build_limit_group(self, key):
+        """
+        Build the "图片大小限制" group shared by the merge and slice tabs.
+        key names the slider in the label-update coalescer.
+        Returns (group, radio_preset, slider, radio_custom, custom_input).
+        """
+        limit_group = QGroupBox("图片大小限制 (KB)")
+        limit_group.setStyleSheet(self._GROUP_STYLE)
+        limit_layout = QVBoxLayout()
+
+        radio_preset = QRadioButton("预设: 150 KB")
+        radio_preset.setChecked(True)
+        slider = QSlider(Qt.Orientation.Horizontal)
+        slider.setMinimum(0)
+        slider.setMaximum(5) # 0:Unlimited, 1:150, 2:300, 3:500, 4:750, 5:1000
+        slider.setValue(1)
+        slider.setTickPosition(QSlider.TickPosition.TicksBelow)
+        slider.setTickInterval(1)
+        slider.valueChanged.connect(lambda v: self._queue_slider_update(key, self.update_limit_label, v, radio_preset))
+        
+        # When slider interacts, auto-check preset radio
+        slider.sliderPressed.connect(lambda: radio_preset.setChecked(True))
+        
+        radio_custom = QRadioButton("自定义:")
+        custom_input = QLineEdit()
+        custom_input.setPlaceholderText("KB")
+        custom_input.setValidator(self._validator_20000)
+        custom_input.setFixedWidth(60)
+        custom_input.setEnabled(False)
+        radio_custom.toggled.connect(custom_input.setEnabled)
+        
+        # Layout row 1: Radio + Slider
+        row1 = QHBoxLayout()
+        row1.addWidget(radio_preset)
+        row1.addWidget(slider)
+        
+        # Layout row 2: Radio + Input
+        row2 = QHBoxLayout()
+        row2.addWidget(radio_custom)
+        row2.addWidget(custom_input)
+        row2.addStretch()
+        
+        limit_layout.addLayout(row1)
+        limit_layout.addLayout(row2)
+        limit_group.setLayout(limit_layout)
+        return limit_group, radio_preset, slider, radio_custom, custom_input
+
+    def _add_grid_presets(self, grid_layout, slot):
+        """Add the _GRID_PRESETS button rows to grid_layout, all wired to slot."""
+        for row in self._GRID_PRESETS:
+            row_layout = QHBoxLayout()
+            for label, r, c, width in row:
+                btn = QPushButton(label)
+                btn.setFixedWidth(width)
+                btn.setProperty("grid_rc", (r, c))
+                btn.clicked.connect(slot)
+                row_layout.addWidget(btn)
+            row_layout.addStretch()
+            grid_layout.addLayout(row_layout)
+
+    def _on_slice_grid_preset(self):
+        # Shared slot for all slice preset buttons; (rows, cols) lives on the button
+        self.set_grid_val(*self.sender().property("grid_rc"))
 
     def set_grid_val(self, r, c):
         self.s_grid_rows.setText(str(r))
@@ -1077,14 +1378,23 @@ class ImageMatrixApp(QMainWindow):
             if self.s_radio_h.isChecked():
                 self.s_count_label.setText(f"切成：{val} 行 (每份高度自动计算)")
     def _get_limit_mb(self, value):
-        # 0: Unlimited
-        # 1: 1 MB
-        # 2: 5 MB
-        # 3: 10 MB
-        # 4: 20 MB
-        # 5: 50 MB
-        mapping = {0: 0, 1: 1, 2: 5, 3: 10, 4: 20, 5: 50}
-        return mapping.get(value, 0)
+        # 0: Unlimited, then 1 / 5 / 10 / 20 / 50 MB
+        return _MB_LIMITS[value] if 0 <= value < len(_MB_LIMITS) else 0
+
+    def _get_limit_kb(self, value):
+        # 0: Unlimited, then 150 / 300 / 500 / 750 KB and 1 MB (1000 KB)
+        return _KB_LIMITS[value] if 0 <= value < len(_KB_LIMITS) else 0
+
+    def _queue_slider_update(self, key, func, *args):
+        # Keep only the latest update per slider; the timer flushes them together
+        self._pending_slider_updates[key] = (func, args)
+        if not self._slider_timer.isActive():
+            self._slider_timer.start()
+
+    def _flush_slider_updates(self):
+        pending, self._pending_slider_updates = self._pending_slider_updates, {}
+        for func, args in pending.values():
+            func(*args)
 
     def update_limit_label_new(self, value, label_widget):
         mb = self._get_limit_mb(value)
@@ -1094,21 +1404,7 @@ class ImageMatrixApp(QMainWindow):
             label_widget.setText(f"单页限制: {mb} MB")
 
     def update_limit_label(self, value, label_widget):
-        # 0: Unlimited
-        # 1: 150 KB
-        # 2: 300 KB
-        # 3: 500 KB
-        # 4: 750 KB
-        # 5: 1 MB (1000 KB)
-        mapping = {
-            0: 0,
-            1: 150,
-            2: 300,
-            3: 500,
-            4: 750,
-            5: 1000
-        }
-        kb_val = mapping.get(value, 0)
+        kb_val = self._get_limit_kb(value)
         
         if kb_val == 0:
             label_widget.setText("预设: 无限制")
@@ -1124,73 +1420,100 @@ class ImageMatrixApp(QMainWindow):
         else:
             event.ignore()
 
+    def _drop_extensions(self, tab_index):
+        # Define valid extensions based on tab
+        return self._CONVERT_EXTS if tab_index == 3 else self._IMAGE_EXTS
+
     def dropEvent(self, event: QDropEvent):
         files = [u.toLocalFile() for u in event.mimeData().urls()]
         
         current_index = self.tabs.currentIndex()
+        valid_extensions = self._drop_extensions(current_index)
         
-        # Define valid extensions based on tab
-        if current_index == 3: # Convert Tab
-             valid_extensions = ('.pdf', '.psd', '.ppt', '.pptx')
+        if any(os.path.isdir(path) for path in files):
+            # Scanning a big folder would freeze the window, so do it on the pool
+            QThreadPool.globalInstance().start(FolderScanTask(files, valid_extensions, current_index, self._scan_signals))
         else:
-             valid_extensions = ('.jpg', '.jpeg', '.png', '.pdf')
-        
-        new_files = []
-        for path in files:
-            if os.path.isfile(path) and path.lower().endswith(valid_extensions):
-                new_files.append(path)
-            elif os.path.isdir(path):
-                for root, _, filenames in os.walk(path):
-                    for fname in filenames:
-                        if fname.lower().endswith(valid_extensions):
-                            new_files.append(os.path.join(root, fname))
+            self._on_files_collected(current_index, _collect_dropped(files, valid_extensions))
 
+    def _on_files_collected(self, current_index, new_files):
         if not new_files:
-            QMessageBox.warning(self, "无效文件", f"当前模式不支持该文件格式。\n仅支持: {valid_extensions}")
+            valid_extensions = self._drop_extensions(current_index)
+            QMessageBox.warning(self, "无效文件", f"当前模式不支持该文件格式。\n仅支持: {', '.join(sorted(valid_extensions))}")
             return
 
         if current_index == 0: # Merge Tab
-            combined_set = set(self.merge_images + new_files)
-            self.merge_images = sort_files(list(combined_set))
-            self.update_merge_list()
-            self.m_split_slider.setMaximum(max(1, len(self.merge_images)))
+            fresh = self._take_unseen(self._merge_set, new_files)
+            if fresh:
+                # heapq.merge needs merge_images in sort_key order; after a
+                # rename the whole list is sorted again first
+                if not self._merge_sorted:
+                    self.merge_images.sort(key=sort_key)
+                    self._merge_sorted = True
+                # Sort only the new paths and splice them in linearly
+                self.merge_images = list(heapq.merge(self.merge_images, sort_files(fresh), key=sort_key))
+                self.update_merge_list()
+                self.m_split_slider.setMaximum(max(1, len(self.merge_images)))
         elif current_index == 1: # Slice Tab
             # For slicing, order matters less, just append
-            for img in new_files:
-                if img not in self.slice_images:
-                    self.slice_images.append(img)
-            self.update_slice_list()
+            fresh = self._take_unseen(self._slice_set, new_files)
+            if fresh:
+                self.slice_images.extend(fresh)
+                self.update_slice_list()
         elif current_index == 2: # Combine Tab
             for img in new_files:
                 # Add to widget directly
-                from PyQt6.QtWidgets import QListWidgetItem
-                item = QListWidgetItem(os.path.basename(img))
+                item = QListWidgetItem(_split_path(img).basename)
                 item.setData(Qt.ItemDataRole.UserRole, img)
                 self.combine_list.addItem(item)
         elif current_index == 3: # Convert Tab
-             for f in new_files:
-                 if f not in self.convert_files:
-                     self.convert_files.append(f)
-             self.update_convert_list()
+            fresh = self._take_unseen(self._convert_set, new_files)
+            if fresh:
+                self.convert_files.extend(fresh)
+                self.update_convert_list()
+
+    def _take_unseen(self, seen, new_files):
+        """
+        Return the paths in new_files that are not in seen yet (first
+        occurrence only, order kept) and record them in seen.
+        Only the new paths are hashed, not the list already accepted.
+        """
+        fresh = []
+        for path in new_files:
+            if path not in seen:
+                seen.add(path)
+                fresh.append(path)
+        return fresh
+
+    def _fill_list(self, list_widget, paths):
+        # One addItems call inserts all rows at once instead of one model insert per file;
+        # selection/current-row signals from the intermediate clear() are muted too
+        list_widget.setUpdatesEnabled(False)
+        list_widget.blockSignals(True)
+        try:
+            list_widget.clear()
+            list_widget.addItems([_split_path(p).basename for p in paths])
+        finally:
+            list_widget.blockSignals(False)
+            list_widget.setUpdatesEnabled(True)
 
     def update_merge_list(self):
-        self.merge_list.clear()
-        for path in self.merge_images:
-            self.merge_list.addItem(os.path.basename(path))
+        self._fill_list(self.merge_list, self.merge_images)
 
     def update_slice_list(self):
-        self.slice_list.clear()
-        for path in self.slice_images:
-            self.slice_list.addItem(os.path.basename(path))
+        self._fill_list(self.slice_list, self.slice_images)
 
     def clear_merge_list(self):
         self.merge_images = []
+        self._merge_sorted = True
+        self._merge_set.clear()
         self.merge_list.clear()
         self.m_split_slider.setMaximum(1)
         self.m_split_slider.setValue(1)
 
     def clear_slice_list(self):
         self.slice_images = []
+        self._slice_set.clear()
         self.slice_list.clear()
 
     def clear_combine_list(self):
@@ -1198,20 +1521,19 @@ class ImageMatrixApp(QMainWindow):
 
     def clear_convert_list(self):
         self.convert_files = []
+        self._convert_set.clear()
         self.convert_list.clear()
         
     def update_convert_list(self):
-        self.convert_list.clear()
-        for path in self.convert_files:
-             self.convert_list.addItem(os.path.basename(path))
+        self._fill_list(self.convert_list, self.convert_files)
 
     def delete_convert_items(self):
-        self._delete_items(self.convert_list, self.convert_files)
+        self._delete_items(self.convert_list, self.convert_files, self._convert_set)
 
     def delete_combine_items(self):
-        items = self.combine_list.selectedItems()
-        for item in items:
-            self.combine_list.takeItem(self.combine_list.row(item))
+        model = self.combine_list.model()
+        for start, count in self._selected_runs(self.combine_list):
+            model.removeRows(start, count)
 
     def rename_combine_items(self):
         # Rename logic for combine tab - just changes the display text, not the file?
@@ -1222,67 +1544,59 @@ class ImageMatrixApp(QMainWindow):
         if count < 2:
             return
             
-        items = []
-        for i in range(count):
-            items.append(self.combine_list.item(i))
-            
-        if key == 'name':
-            items.sort(key=lambda x: x.text().lower(), reverse=not ascending)
-        elif key == 'size':
-            # Need to get file size from path
-            def get_size(item):
-                path = item.data(Qt.ItemDataRole.UserRole)
-                if path and os.path.exists(path):
-                    return os.path.getsize(path)
-                return 0
-            items.sort(key=get_size, reverse=not ascending)
-        
-        # Actually simplest way is takeItem and insert
-        for item in items:
-            self.combine_list.takeItem(self.combine_list.row(item))
-            
-        for item in items:
-            self.combine_list.addItem(item)
-
-    def sort_combine_list(self, key, ascending):
-        count = self.combine_list.count()
-        if count < 2:
-            return
-            
-        items = []
-        for i in range(count):
-            items.append(self.combine_list.item(i))
+        items = [self.combine_list.item(i) for i in range(count)]
             
         if key == 'name':
             # Natural Sort Key
             def natural_key(item):
                 text = item.text().lower()
-                return [int(c) if c.isdigit() else c for c in re.split(r'(\d+)', text)]
+                return [int(c) if c.isdigit() else c for c in _NATURAL_RE.split(text)]
             
             items.sort(key=natural_key, reverse=not ascending)
         elif key == 'size':
-            # Need to get file size from path
-            def get_size(item):
-                path = item.data(Qt.ItemDataRole.UserRole)
-                if path and os.path.exists(path):
-                    return os.path.getsize(path)
-                return 0
-            items.sort(key=get_size, reverse=not ascending)
-            
-        # Re-populate
-        # self.combine_list.clear() # Clear deletes items? Yes.
-        # Taking items out might be safer
-        
-        # Actually simplest way is takeItem and insert
-        for item in items:
-            self.combine_list.takeItem(self.combine_list.row(item))
+            # A single stat() both checks the file and gives its size (missing
+            # files sort as 0). stat releases the GIL, so on a network drive
+            # running them side by side hides most of the round trips.
+            def get_size(path):
+                if not path:
+                    return 0
+                try:
+                    return os.stat(path).st_size
+                except OSError:
+                    return 0
+            # Sizes are kept on the items, so flipping asc/desc stats nothing
+            sizes = [item.data(_SIZE_ROLE) for item in items]
+            missing = [i for i, size in enumerate(sizes) if size is None]
+            if missing:
+                paths = [items[i].data(Qt.ItemDataRole.UserRole) for i in missing]
+                with ThreadPoolExecutor(max_workers=16) as executor:
+                    for i, size in zip(missing, executor.map(get_size, paths)):
+                        sizes[i] = size
+                        items[i].setData(_SIZE_ROLE, size)
+            order = sorted(range(count), key=sizes.__getitem__, reverse=not ascending)
+            items = [items[i] for i in order]
             
-        for item in items:
-            self.combine_list.addItem(item)
+        # Detach every item, last row first so each takeItem is O(1) instead
+        # of a row() search, then re-add in sorted order in one repaint.
+        # As in _fill_list, the intermediate selection/current-row signals are muted.
+        self.combine_list.setUpdatesEnabled(False)
+        self.combine_list.blockSignals(True)
+        try:
+            for row in range(count - 1, -1, -1):
+                self.combine_list.takeItem(row)
+            for item in items:
+                self.combine_list.addItem(item)
+        finally:
+            self.combine_list.blockSignals(False)
+            self.combine_list.setUpdatesEnabled(True)
 
     # --- Actions ---
 
     # --- Helper Methods for Splitting ---
+    def _on_merge_grid_preset(self):
+        # Shared slot for all merge preset buttons; (rows, cols) lives on the button
+        self.set_merge_grid_val(*self.sender().property("grid_rc"))
+
     def set_merge_grid_val(self, r, c):
         self.m_grid_rows.setText(str(r))
         self.m_grid_cols.setText(str(c))
@@ -1299,12 +1613,33 @@ class ImageMatrixApp(QMainWindow):
             self.m_split_group.setTitle("分组拼接设置")
             self.m_split_slider.setEnabled(True)
 
+    def _checked_choice(self, choices, default):
+        """Value paired with the first checked radio in choices, else default."""
+        return next((value for radio, value in choices if radio.isChecked()), default)
+
+    def _line_int(self, line_edit):
+        """
+        Integer in a validated line edit, or None if it is empty or out of range.
+        The validator guarantees digits, so no ValueError on the normal path.
+        """
+        if not line_edit.hasAcceptableInput():
+            return None
+        return int(line_edit.text())
+
+    def _parse_grid(self, rows_edit, cols_edit):
+        """(rows, cols) from a pair of grid line edits, or None if either is invalid."""
+        rows = self._line_int(rows_edit)
+        cols = self._line_int(cols_edit)
+        if rows is None or cols is None:
+            return None
+        return rows, cols
+
     def start_stitching(self):
         if not self.merge_images:
             QMessageBox.warning(self, "提示", "请先添加图片！")
             return
 
-        desktop_path = os.path.join(os.path.expanduser("~"), "Desktop")
+        desktop_path = _DESKTOP_PATH
         
         # Get settings
         split_count = self.m_split_slider.value()
@@ -1315,68 +1650,64 @@ class ImageMatrixApp(QMainWindow):
         elif self.m_radio_1080.isChecked():
             target_width = 1080
         elif self.m_radio_custom.isChecked():
-            try:
-                val_text = self.m_custom_input.text().strip()
-                if not val_text: raise ValueError
-                target_width = int(val_text)
-            except ValueError:
+            target_width = self._line_int(self.m_custom_input)
+            if target_width is None:
                 QMessageBox.warning(self, "输入错误", "请输入有效的宽度！")
                 return
 
         # Get Limit
         limit_val = 0
         if self.m_radio_limit_custom.isChecked():
-            try:
-                c_val = int(self.m_limit_custom_input.text().strip())
-                if c_val <= 0: raise ValueError
-                limit_val = c_val
-            except ValueError:
-                 QMessageBox.warning(self, "输入错误", "请输入有效的限制大小(KB)！")
-                 return
+            limit_val = self._line_int(self.m_limit_custom_input)
+            if limit_val is None:
+                QMessageBox.warning(self, "输入错误", "请输入有效的限制大小(KB)！")
+                return
         else:
             # Slider mapping
-            slider_val = self.m_limit_slider.value()
-            mapping = {0: 0, 1: 150, 2: 300, 3: 500, 4: 750, 5: 1000}
-            limit_val = mapping.get(slider_val, 0)
+            limit_val = self._get_limit_kb(self.m_limit_slider.value())
         
         # Get Mode
-        mode = 'vertical'
+        mode = self._checked_choice(self._stitch_mode_table, 'vertical')
         rows = None
         cols = None
         
-        if self.m_radio_h.isChecked():
-            mode = 'horizontal'
-        elif self.m_radio_grid.isChecked():
-            mode = 'grid'
-            try:
-                rows = int(self.m_grid_rows.text())
-                cols = int(self.m_grid_cols.text())
-                if rows <= 0 or cols <= 0:
-                     raise ValueError
-            except ValueError:
+        if mode == 'grid':
+            grid = self._parse_grid(self.m_grid_rows, self.m_grid_cols)
+            if grid is None:
                 QMessageBox.warning(self, "错误", "宫格模式请输入有效的行数和列数！")
                 return
-
-                return
+            rows, cols = grid
 
         # Get Format
-        output_format = 'AUTO'
-        if self.m_radio_fmt_jpg.isChecked(): output_format = 'JPG'
-        elif self.m_radio_fmt_png.isChecked(): output_format = 'PNG'
-        elif self.m_radio_fmt_pdf.isChecked(): output_format = 'PDF'
+        output_format = self._checked_choice(self._stitch_fmt_table, 'AUTO')
 
-        self.m_start_btn.setEnabled(False)
-        self.m_start_btn.setText("正在拼接... ")
+        # The button stays enabled: another click queues another job
+        self._stitch_running += 1
+        self.m_start_btn.setText(f"正在拼接... ({self._stitch_running})")
         
         custom_name = self.m_name_input.text().strip()
+        config = StitchConfig(desktop_path, split_count, target_width, limit_val, mode, rows, cols, output_format, custom_name)
         
-        self.stitch_thread = StitcherThread(self.merge_images, desktop_path, split_count, target_width, limit_val, mode, rows, cols, output_format, custom_name)
-        self.stitch_thread.finished_signal.connect(self.on_stitching_finished)
-        self.stitch_thread.start()
+        # Snapshot the list: the job may wait in the queue while the user edits it
+        task = StitcherTask(list(self.merge_images), config)
+        task.signals.finished_signal.connect(self.on_stitching_finished)
+        self._submit_job(task)
+
+    def _submit_job(self, task):
+        """
+        Start a background task on the job pool. The task is kept referenced
+        until it finishes, so its signals outlive the start_* call.
+        """
+        self._running_jobs.add(task)
+        task.signals.finished_signal.connect(lambda *_: self._running_jobs.discard(task))
+        self._job_pool.start(task)
 
     def on_stitching_finished(self, success, message):
-        self.m_start_btn.setEnabled(True)
-        self.m_start_btn.setText("开始拼接 (保存到桌面)")
+        self._stitch_running -= 1
+        if self._stitch_running:
+            self.m_start_btn.setText(f"正在拼接... ({self._stitch_running})")
+        else:
+            self.m_start_btn.setText("开始拼接 (保存到桌面)")
         if success:
             QMessageBox.information(self, "成功", f"{message}\n已保存到桌面。")
         else:
@@ -1397,13 +1728,13 @@ class ImageMatrixApp(QMainWindow):
         
         img_path = self.slice_images[selected_row]
         
-        try:
-            r = int(self.s_grid_rows.text())
-            c = int(self.s_grid_cols.text())
-        except ValueError:
-             QMessageBox.warning(self, "提示", "请输入有效的行和列数值。")
-             return
+        grid = self._parse_grid(self.s_grid_rows, self.s_grid_cols)
+        if grid is None:
+            QMessageBox.warning(self, "提示", "请输入有效的行和列数值。")
+            return
+        r, c = grid
              
+        from grid_preview import PreviewDialog
         dlg = PreviewDialog(img_path, r, c, self)
         dlg.exec()
 
@@ -1412,7 +1743,7 @@ class ImageMatrixApp(QMainWindow):
             QMessageBox.warning(self, "提示", "请先添加要切分的图片！")
             return
 
-        desktop_path = os.path.join(os.path.expanduser("~"), "Desktop")
+        desktop_path = _DESKTOP_PATH
         
         # Settings
         count = self.s_count_slider.value()
@@ -1420,68 +1751,61 @@ class ImageMatrixApp(QMainWindow):
         
         target_width = None
         if self.s_radio_custom.isChecked():
-            val_text = self.s_custom_input.text().strip()
-            if not val_text:
+            if not self.s_custom_input.text():
                 # User left it empty, use default placeholder value
                 target_width = 750
             else:
-                try:
-                    target_width = int(val_text)
-                except ValueError:
+                target_width = self._line_int(self.s_custom_input)
+                if target_width is None:
                     QMessageBox.warning(self, "输入错误", "请输入有效的宽度！")
                     return
 
         # Get Format
-        output_format = 'AUTO'
-        if self.s_radio_fmt_jpg.isChecked(): output_format = 'JPG'
-        elif self.s_radio_fmt_png.isChecked(): output_format = 'PNG'
-        elif self.s_radio_fmt_pdf.isChecked(): output_format = 'PDF'
+        output_format = self._checked_choice(self._slice_fmt_table, 'AUTO')
 
         # Get Limit
         limit_val = 0
         if self.s_radio_limit_custom.isChecked():
-             try:
-                c_val = int(self.s_limit_custom_input.text().strip())
-                if c_val <= 0: raise ValueError
-                limit_val = c_val
-             except ValueError:
-                 QMessageBox.warning(self, "输入错误", "请输入有效的限制大小(KB)！")
-                 return
+            limit_val = self._line_int(self.s_limit_custom_input)
+            if limit_val is None:
+                QMessageBox.warning(self, "输入错误", "请输入有效的限制大小(KB)！")
+                return
         else:
-            slider_val = self.s_limit_slider.value()
-            mapping = {0: 0, 1: 150, 2: 300, 3: 500, 4: 750, 5: 1000}
-            limit_val = mapping.get(slider_val, 0)
+            limit_val = self._get_limit_kb(self.s_limit_slider.value())
 
         # Get Direction/Mode
-        direction = 'horizontal'
+        direction = self._checked_choice(self._slice_mode_table, 'horizontal')
         rows = None
         cols = None
         
-        if self.s_radio_v.isChecked():
-            direction = 'vertical'
-        elif self.s_radio_grid.isChecked():
-            direction = 'grid'
-            try:
-                rows = int(self.s_grid_rows.text())
-                cols = int(self.s_grid_cols.text())
-                if rows <= 0 or cols <= 0:
-                    raise ValueError("行数和列数必须大于0")
-            except ValueError:
-                 QMessageBox.warning(self, "错误", "请设置正确的行数和列数！")
-                 return
+        if direction == 'grid':
+            grid = self._parse_grid(self.s_grid_rows, self.s_grid_cols)
+            if grid is None:
+                QMessageBox.warning(self, "错误", "请设置正确的行数和列数！")
+                return
+            rows, cols = grid
 
-        self.s_start_btn.setEnabled(False)
-        self.s_start_btn.setText("正在切图... ")
+        # The button stays enabled: another click queues another job
+        self._slice_running += 1
+        self.s_start_btn.setText(f"正在切图... ({self._slice_running})")
         
         custom_name = self.s_name_input.text().strip()
+        config = SliceConfig(desktop_path, count, smart_mode, target_width, limit_val, direction, rows, cols, output_format, custom_name)
+
+        task = SlicerTask(list(self.slice_images), config)
+        task.signals.finished_signal.connect(self.on_slicing_finished)
+        task.signals.progress_signal.connect(self.on_slicing_progress)
+        self._submit_job(task)
 
-        self.slicer_thread = SlicerThread(self.slice_images, desktop_path, count, smart_mode, target_width, limit_val, direction, rows, cols, output_format, custom_name)
-        self.slicer_thread.finished_signal.connect(self.on_slicing_finished)
-        self.slicer_thread.start()
+    def on_slicing_progress(self, done, total):
+        self.s_start_btn.setText(f"正在切图... {done}/{total}")
 
     def on_slicing_finished(self, success, message):
-        self.s_start_btn.setEnabled(True)
-        self.s_start_btn.setText("开始切图 (保存到桌面)")
+        self._slice_running -= 1
+        if self._slice_running:
+            self.s_start_btn.setText(f"正在切图... ({self._slice_running})")
+        else:
+            self.s_start_btn.setText("开始切图 (保存到桌面)")
         if success:
             QMessageBox.information(self, "完成", message)
         else:
@@ -1492,7 +1816,7 @@ class ImageMatrixApp(QMainWindow):
             QMessageBox.warning(self, "提示", "请先添加图片！")
             return
 
-        desktop_path = os.path.join(os.path.expanduser("~"), "Desktop")
+        desktop_path = _DESKTOP_PATH
         
         # Get Items in Order
         paths = []
@@ -1532,9 +1856,9 @@ class ImageMatrixApp(QMainWindow):
         self.c_start_btn.setEnabled(False)
         self.c_start_btn.setText("正在合并... ")
         
-        self.merger_thread = MergerThread(paths, output_file_path, limit_val)
-        self.merger_thread.finished_signal.connect(self.on_combining_finished)
-        self.merger_thread.start()
+        task = MergerTask(paths, output_file_path, limit_val)
+        task.signals.finished_signal.connect(self.on_combining_finished)
+        self._submit_job(task)
 
     def on_combining_finished(self, success, message):
         self.c_start_btn.setEnabled(True)
@@ -1549,18 +1873,26 @@ class ImageMatrixApp(QMainWindow):
             QMessageBox.warning(self, "提示", "请先添加文件！")
             return
 
-        desktop_path = os.path.join(os.path.expanduser("~"), "Desktop")
+        desktop_path = _DESKTOP_PATH
         
         fmt = 'jpg'
         if self.cv_radio_png.isChecked():
             fmt = 'png'
+
+        dpi = 150
+        if self.cv_radio_dpi_300.isChecked():
+            dpi = 300
             
         self.cv_start_btn.setEnabled(False)
         self.cv_start_btn.setText("正在转换...")
 
-        self.converter_thread = ConverterThread(self.convert_files, desktop_path, fmt)
-        self.converter_thread.finished_signal.connect(self.on_converting_finished)
-        self.converter_thread.start()
+        task = ConverterTask(list(self.convert_files), desktop_path, fmt, dpi)
+        task.signals.finished_signal.connect(self.on_converting_finished)
+        task.signals.progress_signal.connect(self.on_converting_progress)
+        self._submit_job(task)
+
+    def on_converting_progress(self, done, total):
+        self.cv_start_btn.setText(f"正在转换... {done}/{total}")
 
     def on_converting_finished(self, success, message):
         self.cv_start_btn.setEnabled(True)
@@ -1571,7 +1903,10 @@ class ImageMatrixApp(QMainWindow):
              QMessageBox.warning(self, "注意", message)
 
 if __name__ == "__main__":
+    # Worker processes re-import this module; needed for frozen Windows builds
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
+    QPixmapCache.setCacheLimit(131072) # KB; holds the combine list's hover previews
     window = ImageMatrixApp()
     window.show()
     sys.exit(app.exec())
@@ -1,58 +1,110 @@
 
 from PIL import Image
+import fitz  # PyMuPDF
 import os
 import io
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+from utils import encode_into, search_jpeg_quality
 
 # Disable the DecompressionBombError for large images
 Image.MAX_IMAGE_PIXELS = None
 
-def get_compressed_image(image, max_kb):
+def _jpeg_probe(image, quality, buf):
     """
-    Returns a copy of the image compressed to be under max_kb.
-    Returns the original image (converted to RGB) if max_kb is not valid or compression fails.
+    Encode image as JPEG at quality into the reused buf, only to measure it.
+    Returns (quality, size); no bytes are copied out.
+    """
+    return quality, encode_into(buf, image, "JPEG", quality=quality)
+
+def _jpeg_bytes(image, quality):
+    """
+    The encode that goes into the PDF. Optimized Huffman tables cost about
+    2.5x a plain encode, so they are spent once here rather than on every
+    probe; they only make the file smaller, so a fitting quality still fits.
+    """
+    buf = io.BytesIO()
+    image.save(buf, "JPEG", quality=quality, optimize=True)
+    return buf.getvalue()
+
+def get_compressed_jpeg(image, max_kb):
+    """
+    Returns the image encoded as JPEG bytes, compressed to be under max_kb.
+    Returns the quality 95 encoding if max_kb is not valid or it already fits.
     """
     if image.mode != 'RGB':
         image = image.convert('RGB')
         
     if not max_kb or max_kb <= 0:
-        return image
+        return _jpeg_bytes(image, 95)
         
     target_bytes = max_kb * 1024
-    
-    # Binary search for quality
-    min_q = 10
-    max_q = 95
-    best_q = min_q
+    buf = io.BytesIO()
     
     # Quick check at 95
-    buf = io.BytesIO()
-    image.save(buf, "JPEG", quality=95)
-    if buf.tell() <= target_bytes:
-        return image # already small enough
+    over = _jpeg_probe(image, 95, buf)
+    if over[1] <= target_bytes:
+        return _jpeg_bytes(image, 95) # already small enough
         
-    best_img_bytes = None
+    # Bracket the target between a probe under it and one over it
+    under = _jpeg_probe(image, 40, buf)
+    if under[1] > target_bytes:
+        over = under
+        under = _jpeg_probe(image, 10, buf)
+        if under[1] > target_bytes:
+            # If even at lowest quality it's too big, just return lowest quality version
+            return _jpeg_bytes(image, 10)
     
-    while min_q <= max_q:
-        mid_q = (min_q + max_q) // 2
-        buf = io.BytesIO()
-        image.save(buf, "JPEG", quality=mid_q)
-        size = buf.tell()
-        
-        if size <= target_bytes:
-            best_q = mid_q
-            best_img_bytes = buf.getvalue()
-            min_q = mid_q + 1
-        else:
-            max_q = mid_q - 1
+    # Predict the fitting quality from the size curve (see search_jpeg_quality)
+    under = search_jpeg_quality(lambda q: _jpeg_probe(image, q, buf), target_bytes, under, over)
+    
+    return _jpeg_bytes(image, under[0])
+
+
+def _embeddable_jpeg(img, path, max_kb):
+    """
+    True if the source file can go into the PDF byte for byte: a plain
+    RGB/grayscale JPEG that already fits max_kb (or there is no limit).
+    """
+    if img.format != 'JPEG' or img.mode not in ('RGB', 'L'):
+        return False
+    if not max_kb or max_kb <= 0:
+        return True
+    return os.path.getsize(path) <= max_kb * 1024
+
+def _add_page(doc, data, width, height):
+    # Page size at 100 dpi, as before: 72 points per inch
+    page = doc.new_page(width=width * 0.72, height=height * 0.72)
+    page.insert_image(page.rect, stream=data)
+
+def _encode_pages(path, max_kb):
+    """
+    Encode every page of one input file as (jpeg_bytes, width, height).
+    Runs on a worker thread. A file that fails part way keeps the pages
+    read before the error.
+    """
+    pages = []
+    try:
+        with Image.open(path) as img:
+            # JPEGs that need no recompression are copied without decoding
+            if _embeddable_jpeg(img, path, max_kb):
+                with open(path, 'rb') as f:
+                    pages.append((f.read(), img.width, img.height))
+                return pages
             
-    if best_img_bytes:
-        return Image.open(io.BytesIO(best_img_bytes))
-    else:
-        # If even at lowest quality it's too big, just return lowest quality version
-        buf = io.BytesIO()
-        image.save(buf, "JPEG", quality=10)
-        return Image.open(io.BytesIO(buf.getvalue()))
+            # Check for multiple frames/pages (GIF, PDF, TIFF)
+            n_frames = getattr(img, 'n_frames', 1)
+            
+            for i in range(n_frames):
+                if n_frames > 1:
+                    img.seek(i)
+                # No RGB copy of the frame: get_compressed_jpeg converts other
+                # modes itself, and each frame is encoded before the next seek
+                pages.append((get_compressed_jpeg(img, max_kb), img.width, img.height))
 
+    except Exception as e:
+        print(f"Warning: Failed to load {path}: {e}")
+    return pages
 
 def merge_images_to_pdf(image_paths, output_path, max_kb_per_page=None):
     """
@@ -62,43 +114,24 @@ def merge_images_to_pdf(image_paths, output_path, max_kb_per_page=None):
         return False, "No images selected."
         
     try:
-        images_to_save = []
+        # Pages are embedded as JPEG streams (DCTDecode), so nothing is decoded
+        # again or re-encoded by the PDF writer, and only compressed pages are
+        # held in memory.
+        doc = fitz.open()
         
-        for path in image_paths:
-            try:
-                img = Image.open(path)
-                
-                # Check for multiple frames/pages (GIF, PDF, TIFF)
-                n_frames = getattr(img, 'n_frames', 1)
+        # Decode and JPEG encode release the GIL, so inputs are processed on
+        # threads; map() hands the results back in input order.
+        with ThreadPoolExecutor(max_workers=os.cpu_count() or 1) as executor:
+            for pages in executor.map(_encode_pages, image_paths, repeat(max_kb_per_page)):
+                for data, width, height in pages:
+                    _add_page(doc, data, width, height)
                 
-                for i in range(n_frames):
-                    img.seek(i)
-                    # Convert to RGB immediately to handle various modes and ensure copy
-                    frame = img.convert('RGB')
-                    
-                    # Compress/Process
-                    processed_img = get_compressed_image(frame, max_kb_per_page)
-                    images_to_save.append(processed_img)
-
-            except Exception as e:
-                print(f"Warning: Failed to load {path}: {e}")
-                
-        if not images_to_save:
+        if doc.page_count == 0:
             return False, "No valid images to merge."
             
-        # Save to PDF
-        # The first image is the 'base', others are appended
-        base_image = images_to_save[0]
-        other_images = images_to_save[1:]
-        
-        # We assume save using default PDF quality (which might be re-compressed). 
-        # But since we fed in compressed objects, it should be okay-ish.
-        # Alternatively, we can pass quality=... here too? 
-        # PIL PDF driver uses 'quality' arg if available.
-        
-        base_image.save(output_path, "PDF", resolution=100.0, save_all=True, append_images=other_images, quality=95)
+        doc.save(output_path)
         
-        return True, f"Successfully merged {len(images_to_save)} images into {os.path.basename(output_path)}"
+        return True, f"Successfully merged {doc.page_count} images into {os.path.basename(output_path)}"
         
     except Exception as e:
         return False, f"Error merging PDF: {e}"
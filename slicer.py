@@ -1,70 +1,170 @@
 import os
-from PIL import Image, ImageStat
+import io
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+from utils import resize_lanczos
+import numpy as np
 import math
 
 # Disable the DecompressionBombError for large images
 Image.MAX_IMAGE_PIXELS = None
 
-def _is_boundary_solid(image, pos, axis='horizontal'):
-    """
-    Check if a line at `pos` is visually 'solid' or 'quiet'.
-    axis='horizontal': check row at y=pos
-    axis='vertical': check col at x=pos
-    Returns a score (lower is better/more solid).
-    """
-    if pos < 0:
-        return float('inf')
-        
-    if axis == 'horizontal':
-        if pos >= image.height:
-            return float('inf')
-        # Crop a 1px high strip: (left, top, right, bottom)
-        try:
-            boundary_img = image.crop((0, pos, image.width, pos + 1))
-        except Exception:
-            return float('inf')
-    else: # vertical
-        if pos >= image.width:
-            return float('inf')
-        # Crop a 1px wide strip
-        try:
-            boundary_img = image.crop((pos, 0, pos + 1, image.height))
-        except Exception:
-            return float('inf')
-    
-    # Calculate stats
-    stat = ImageStat.Stat(boundary_img)
-    # Variance of the pixels. Low variance = solid color.
-    # We sum the variance of R, G, B
-    variance = sum(stat.var)
-    return variance
+def _line_variances(arr, start, end, axis='horizontal'):
+    """
+    Score the lines start..end-1 of `arr` (rows for axis='horizontal',
+    columns for 'vertical'): the variance of each line's pixels, summed over
+    the bands. Low variance = solid color, i.e. a quiet place to cut.
+    Computed from exact integer sums, as ImageStat does from its histogram,
+    without making a float copy of the band.
+    """
+    lines = arr[start:end] if axis == 'horizontal' else arr[:, start:end].swapaxes(0, 1)
+    n = lines.shape[1]
+    total = lines.sum(axis=1, dtype=np.int64)
+    total_sq = np.einsum('ijk,ijk->ik', lines, lines, dtype=np.int64)
+    mean = total / n
+    return (total_sq / n - mean * mean).sum(axis=-1)
 
-def _find_best_cut(image, target_pos, axis='horizontal', search_range=50):
+def _search_windows(targets, search_range, limit):
     """
-    Finds the best coordinate to cut near target_pos within search_range.
+    The candidate lines [starts[i], ends[i]) searched for a cut near
+    targets[i], for a NumPy array of targets.
     """
-    limit = image.height if axis == 'horizontal' else image.width
-    
-    start_pos = max(0, int(target_pos - search_range))
-    end_pos = min(limit - 1, int(target_pos + search_range))
-    
-    best_pos = target_pos
-    min_score = float('inf')
+    starts = np.maximum(np.trunc(targets - search_range), 0).astype(np.int64)
+    ends = np.minimum(np.trunc(targets + search_range), limit - 1).astype(np.int64)
+    return starts, ends
+
+def _line_scores(image, axis, windows):
+    """
+    Score every line inside the given search windows (inf elsewhere).
+    Windows of neighbouring cuts overlap when cuts are dense, so overlapping
+    windows are merged and each line is scored once for all the cuts of
+    this image.
+    """
+    # Lines are scored on luminance: one byte per pixel instead of one per
+    # band, and a busy line is busy in brightness too. The variance is scaled
+    # by the band count to stay on the scale of a per-band sum, keeping its
+    # balance against the distance weight in _find_best_cuts.
+    bands = len(image.getbands())
+    arr = np.asarray(image.convert('L'))[:, :, np.newaxis]
+
+    limit = arr.shape[0] if axis == 'horizontal' else arr.shape[1]
+    scores = np.full(limit, np.inf)
+    runs = []
+    for start, end in sorted(w for w in windows if w[0] < w[1]):
+        if runs and start <= runs[-1][1]:
+            runs[-1][1] = max(runs[-1][1], end)
+        else:
+            runs.append([start, end])
+    for start, end in runs:
+        scores[start:end] = bands * _line_variances(arr, start, end, axis)
+    return scores
+
+def _find_best_cuts(scores, targets, search_range=50):
+    """
+    Finds the best coordinate to cut near each of targets within
+    search_range, all cuts in one pass.
+    `scores` holds the per-line scores from _line_scores.
+    """
+    starts, ends = _search_windows(targets, search_range, len(scores))
     
     # Distance weight
     DIST_WEIGHT = 0.1
 
-    for pos in range(start_pos, end_pos):
-        variance = _is_boundary_solid(image, pos, axis)
-        
-        dist = abs(pos - target_pos)
-        weighted_score = variance + (dist * DIST_WEIGHT)
-        
-        if weighted_score < min_score:
-            min_score = weighted_score
-            best_pos = pos
-            
-    return int(best_pos)
+    # One row per target holding its window's lines; the shorter windows at
+    # the image edges are padded with inf so they never win.
+    width = max(1, int((ends - starts).max()))
+    lines = starts[:, np.newaxis] + np.arange(width)
+    inside = lines < ends[:, np.newaxis]
+    cost = np.where(inside,
+                    scores[np.minimum(lines, len(scores) - 1)] + np.abs(lines - targets[:, np.newaxis]) * DIST_WEIGHT,
+                    np.inf)
+    # argmin keeps the first of equal scores, like a strict < scan would;
+    # an empty window (tiny image) keeps the plain target position
+    return np.where(starts < ends, starts + np.argmin(cost, axis=1), targets.astype(np.int64))
+
+def _flat_palette(tile):
+    """
+    Returns tile as a palette image if it has at most 256 colors, else None.
+    getcolors() gives up at the 257th distinct color, so photos are rejected
+    after a few pixels; for screenshots and diagrams the count is exact and
+    the palette conversion loses nothing.
+    """
+    if tile.mode != 'RGB':
+        tile = tile.convert('RGB')
+    colors = tile.getcolors(256)
+    if colors is None:
+        return None
+    return tile.quantize(colors=len(colors), dither=Image.Dither.NONE)
+
+def _save_flat_png(tile, output_path, max_kb):
+    """
+    AUTO format: save a flat-color tile as a palette PNG next to where the
+    JPEG would go, which is smaller than the JPEG and free of DCT artifacts.
+    Returns the path written, or None (nothing written) when the tile is
+    not flat or the PNG would exceed max_kb, so the caller falls back to JPEG.
+    """
+    pal = _flat_palette(tile)
+    if pal is None:
+        return None
+    buf = io.BytesIO()
+    dpi = tile.info.get('dpi')
+    if dpi:
+        pal.save(buf, "PNG", compress_level=3, dpi=dpi)
+    else:
+        pal.save(buf, "PNG", compress_level=3)
+    if max_kb and max_kb > 0 and buf.tell() > max_kb * 1024:
+        return None
+    png_path = os.path.splitext(output_path)[0] + ".png"
+    with open(png_path, "wb") as f:
+        f.write(buf.getbuffer())
+    return png_path
+
+def _save_slices(img, jobs, max_kb, fmt_arg, auto=False):
+    """
+    Crop and save every (box, output_path) in jobs.
+    Tiles are independent and Pillow releases the GIL while encoding, so they
+    are saved on threads. This already runs inside a pool worker process,
+    so threads avoid nesting a second process pool and re-sending the image.
+    With auto=True (AUTO format) flat-color tiles are written as PNG instead.
+    Returns the filenames actually written, in job order.
+    """
+    from utils import save_compressed_image
+
+    def save(job):
+        box, output_path = job
+        tile = img.crop(box)
+        if auto:
+            png_path = _save_flat_png(tile, output_path, max_kb)
+            if png_path:
+                return os.path.basename(png_path)
+        save_compressed_image(tile, output_path, max_kb, output_format=fmt_arg)
+        return os.path.basename(output_path)
+
+    if len(jobs) < 2:
+        return [save(job) for job in jobs]
+    with ThreadPoolExecutor(max_workers=min(len(jobs), os.cpu_count() or 1)) as executor:
+        # list() re-raises the first failed save
+        return list(executor.map(save, jobs))
+
+def _load_scaled(image_path, target_width=None):
+    """
+    Open and fully load image_path, resized to target_width (keeping the
+    aspect ratio) when one is given. JPEGs shrinking by 2x or more are
+    decoded at a reduced DCT scale via draft(), so the full-size image is
+    never built; LANCZOS then makes the exact size.
+    """
+    img = Image.open(image_path)
+    if target_width and target_width != img.width:
+        aspect_ratio = img.height / img.width
+        new_height = int(target_width * aspect_ratio)
+        img.draft(None, (target_width, new_height))
+        img.load()
+        if img.size != (target_width, new_height):
+            img = resize_lanczos(img, (target_width, new_height))
+    else:
+        # Force loading to handle some file types properly
+        img.load()
+    return img
 
 def slice_grid_image(image_path, output_dir, rows, cols, target_width=None, max_kb=None, output_format='AUTO', custom_name=None):
     """
@@ -74,13 +174,7 @@ def slice_grid_image(image_path, output_dir, rows, cols, target_width=None, max_
         return False, f"File not found: {image_path}"
         
     try:
-        img = Image.open(image_path)
-        img.load()
-        
-        if target_width and target_width != img.width:
-            aspect_ratio = img.height / img.width
-            new_height = int(target_width * aspect_ratio)
-            img = img.resize((target_width, new_height), Image.Resampling.LANCZOS)
+        img = _load_scaled(image_path, target_width)
             
         width, height = img.size
         cell_width = width / cols
@@ -109,11 +203,11 @@ def slice_grid_image(image_path, output_dir, rows, cols, target_width=None, max_
             ext = ".pdf"
             fmt_arg = 'PDF'
         elif output_format == 'AUTO':
+            # Flat-color tiles are switched to .png by _save_slices
             ext = ".jpg"
             fmt_arg = 'JPEG'
 
-        saved_files = []
-        from utils import save_compressed_image
+        jobs = []
         
         for r in range(rows):
             for c in range(cols):
@@ -124,16 +218,16 @@ def slice_grid_image(image_path, output_dir, rows, cols, target_width=None, max_
                 lower = int((r + 1) * cell_height) if r < rows - 1 else height
                 
                 box = (left, upper, right, lower)
-                slice_img = img.crop(box)
                 
                 # Naming
                 slice_filename = f"{base_name}_r{r+1:02d}_c{c+1:02d}{ext}"
                 output_path = os.path.join(specific_output_dir, slice_filename)
                 
-                # Use format
-                save_compressed_image(slice_img, output_path, max_kb, output_format=fmt_arg)
-                saved_files.append(slice_filename)
+                jobs.append((box, output_path))
                 
+        # Use format; flat AUTO tiles come back with their .png names
+        saved_files = _save_slices(img, jobs, max_kb, fmt_arg, auto=output_format == 'AUTO')
+
         return True, f"Successfully sliced {len(saved_files)} grid parts ({output_format}) into folder '{base_name}'."
         
     except Exception as e:
@@ -147,15 +241,7 @@ def slice_image(image_path, output_dir, count=1, smart_mode=False, target_width=
         return False, f"File not found: {image_path}"
         
     try:
-        img = Image.open(image_path)
-        
-        # Force loading to handle some file types properly
-        img.load()
-        
-        if target_width and target_width != img.width:
-            aspect_ratio = img.height / img.width
-            new_height = int(target_width * aspect_ratio)
-            img = img.resize((target_width, new_height), Image.Resampling.LANCZOS)
+        img = _load_scaled(image_path, target_width)
         
         if direction == 'horizontal':
             total_length = img.height
@@ -163,27 +249,25 @@ def slice_image(image_path, output_dir, count=1, smart_mode=False, target_width=
             total_length = img.width
         
         # Calculate cut points
-        cut_points = [0]
+        cuts = []
         
         if count > 1:
             approx_length = total_length / count
-            
-            for i in range(1, count):
-                target_pos = i * approx_length
-                
-                if smart_mode:
-                    search_range = max(50, int(approx_length * 0.4))
-                    final_pos = _find_best_cut(img, target_pos, axis=direction, search_range=search_range)
-                else:
-                    final_pos = int(target_pos)
-                
-                cut_points.append(final_pos)
-        
-        cut_points.append(total_length)
-        cut_points.sort()
+            search_range = max(50, int(approx_length * 0.4))
+            # All targets at once instead of one Python float op per cut
+            targets = np.arange(1, count) * approx_length
+            if smart_mode:
+                # Score all candidate lines up front, once per image
+                starts, ends = _search_windows(targets, search_range, total_length)
+                scores = _line_scores(img, direction, zip(starts.tolist(), ends.tolist()))
+                cuts = _find_best_cuts(scores, targets, search_range=search_range)
+            else:
+                cuts = targets.astype(np.int64)
         
-        # Ensure we don't have duplicates or out of bounds
-        cut_points = sorted(list(set(cut_points)))
+        # Ensure we don't have duplicates; np.unique sorts as well. Smart cuts
+        # are not always increasing (search windows overlap once they are
+        # wider than half a slice), so a sort is still needed rather than a scan.
+        cut_points = np.unique(np.concatenate(([0], cuts, [total_length])).astype(np.int64)).tolist()
         
         # Perform cuts and save
         base_name = os.path.splitext(os.path.basename(image_path))[0]
@@ -208,11 +292,11 @@ def slice_image(image_path, output_dir, count=1, smart_mode=False, target_width=
             ext = ".pdf"
             fmt_arg = 'PDF'
         elif output_format == 'AUTO':
+            # Flat-color tiles are switched to .png by _save_slices
             ext = ".jpg"
             fmt_arg = 'JPEG'
 
-        saved_files = []
-        from utils import save_compressed_image
+        jobs = []
         
         for i in range(len(cut_points) - 1):
             start = cut_points[i]
@@ -230,8 +314,6 @@ def slice_image(image_path, output_dir, count=1, smart_mode=False, target_width=
                 # (left, top, right, bottom)
                 box = (start, 0, end, img.height)
                 
-            slice_img = img.crop(box)
-            
             # Save
             if direction == 'horizontal':
                 slice_filename = f"{base_name}_{i+1:02d}{ext}"
@@ -240,10 +322,26 @@ def slice_image(image_path, output_dir, count=1, smart_mode=False, target_width=
                 
             output_path = os.path.join(specific_output_dir, slice_filename)
             
-            save_compressed_image(slice_img, output_path, max_kb, output_format=fmt_arg)
-            saved_files.append(slice_filename)
+            jobs.append((box, output_path))
             
+        saved_files = _save_slices(img, jobs, max_kb, fmt_arg, auto=output_format == 'AUTO')
+
         return True, f"Successfully sliced {len(saved_files)} parts ({direction}, {output_format}) into folder '{base_name}'."
         
     except Exception as e:
         return False, f"Error slicing image: {e}"
+
+def slice_one(image_path, output_dir, count, smart_mode, target_width, max_kb, direction, rows, cols, output_format, custom_name):
+    """
+    Slice one image in either grid or linear mode.
+    Module-level so it can be sent to worker processes.
+    Returns (image_path, success, message).
+    """
+    try:
+        if direction == 'grid':
+            s, m = slice_grid_image(image_path, output_dir, rows, cols, target_width, max_kb, output_format, custom_name)
+        else:
+            s, m = slice_image(image_path, output_dir, count, smart_mode, target_width, max_kb, direction, output_format, custom_name)
+    except Exception as e:
+        s, m = False, str(e)
+    return image_path, s, m
@@ -1,18 +1,28 @@
 import re
 
+_NUM_RE = re.compile(r'\d+')
+
+def sort_key(file_path):
+    """
+    Sort key used by sort_files: the last number found in the filename,
+    then the filename itself so files sharing a number still order the
+    same way every time.
+    Exposed so already-sorted lists can be merged with heapq.merge.
+    """
+    # Filename after the last '/' or '\\', without building split lists
+    filename = file_path[max(file_path.rfind('/'), file_path.rfind('\\')) + 1:]
+    # Find all numbers in the filename
+    matches = _NUM_RE.findall(filename)
+    if matches:
+        # Return the last number found, as it's likely the sequence number
+        # e.g. in "20251205_093600_001.jpg", we want 001 (1)
+        return int(matches[-1]), filename
+    return float('inf'), filename # Put files without numbers at the end
+
 def sort_files(file_paths):
     """
     Sorts a list of file paths based on the numeric value found in the filename.
     Handles filenames like "1.jpg", "05image.jpg", "007pic.jpg".
     If no number is found, it falls back to alphabetical sorting.
     """
-    def extract_number(filename):
-        # Find all numbers in the filename
-        matches = re.findall(r'(\d+)', filename)
-        if matches:
-            # Return the last number found, as it's likely the sequence number
-            # e.g. in "20251205_093600_001.jpg", we want 001 (1)
-            return int(matches[-1])
-        return float('inf') # Put files without numbers at the end
-
-    return sorted(file_paths, key=lambda x: extract_number(x.split('/')[-1].split('\\')[-1]))
+    return sorted(file_paths, key=sort_key)
@@ -1,11 +1,132 @@
 
 from PIL import Image
+from utils import resize_lanczos, downscale
 import os
 import math
+import tempfile
+import numpy as np
+from collections import deque
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
 
 # Disable the DecompressionBombError for large images
 Image.MAX_IMAGE_PIXELS = None
 
+# Above this many canvas bytes, a horizontal strip that gets scaled down
+# anyway is assembled directly at the output size (see _stitch_horizontal)
+_DIRECT_SCALE_BYTES = 512 * 1024 * 1024
+
+# Above this many canvas bytes a vertical stitch is assembled in a
+# memory-mapped temporary file instead of RAM (see _mapped_canvas)
+_MAPPED_CANVAS_BYTES = 512 * 1024 * 1024
+
+def _load(img):
+    img.load()
+    return img
+
+def _open(path):
+    """Open path lazily (header only); None if it cannot be opened."""
+    try:
+        return Image.open(path)
+    except Exception as e:
+        print(f"Warning: Failed to open {path}: {e}")
+        return None
+
+def _decode_ahead(images, workers=4):
+    """
+    Yield `images` in order, each already decoded. Pillow releases the GIL
+    while decoding, so the next few images are decoded on threads while the
+    current one is pasted; only `workers` decoded images are held ahead.
+    """
+    workers = max(1, min(workers, os.cpu_count() or 1))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        it = iter(images)
+        pending = deque(executor.submit(_load, img) for img in islice(it, workers))
+        while pending:
+            img = pending.popleft().result()
+            nxt = next(it, None)
+            if nxt is not None:
+                pending.append(executor.submit(_load, nxt))
+            yield img
+
+def _mapped_canvas(width, height):
+    """
+    A zero-filled canvas backed by an anonymous temporary file instead of
+    RAM, for composites that may not fit in memory: the OS pages cold rows
+    out to disk. Returns (pixels, image): pixels are written through the
+    (height, width, 4) RGBX array, and the read-only RGBX image shares its
+    memory for the final resize/save. The file is deleted once both are
+    released.
+    """
+    with tempfile.TemporaryFile() as f:
+        pixels = np.memmap(f, dtype=np.uint8, mode='w+', shape=(height, width, 4))
+    return pixels, Image.frombuffer('RGBX', (width, height), pixels, 'raw', 'RGBX', 0, 1)
+
+def _stitch_vertical_mapped(decoded, max_width, total_height):
+    """
+    _stitch_vertical's canvas for very tall composites, filled row band by
+    row band in a memory-mapped file. Only the margins beside narrower
+    images are painted white; the rest of the file is never touched twice.
+    """
+    pixels, stitched_img = _mapped_canvas(max_width, total_height)
+    
+    current_y = 0
+    for img in decoded:
+        # Center the image horizontally
+        x_offset = (max_width - img.width) // 2
+        band = pixels[current_y:current_y + img.height, :, :3]
+        band[:, :x_offset] = 255
+        band[:, x_offset + img.width:] = 255
+        band[:, x_offset:x_offset + img.width] = np.asarray(img if img.mode == 'RGB' else img.convert('RGB'))
+        current_y += img.height
+        img.close()
+    
+    return stitched_img
+
+# Modes _decode_reduced can reduce() as they are
+_REDUCE_MODES = ('L', 'LA', 'RGB', 'RGBA', 'RGBX', 'CMYK')
+
+def _decode_factor(width, target_width):
+    """
+    The factor (1, 2, 4 or 8) by which the sources can be decoded smaller
+    when the result is scaled from `width` down to target_width anyway.
+    At least 3x the target resolution is left for the final resize, the
+    same margin resize_lanczos keeps with its reducing_gap.
+    """
+    k = 1
+    while target_width and k < 8 and width >= target_width * 3 * k * 2:
+        k *= 2
+    return k
+
+def _decode_reduced(images, k):
+    """
+    _decode_ahead, with every image k times smaller (sizes rounded up, as
+    reduce() does). JPEGs are told to decode at that scale (draft), which
+    libjpeg does in the DCT domain for a fraction of the work; other
+    formats are decoded in full and reduced.
+    """
+    if k == 1:
+        yield from _decode_ahead(images)
+        return
+    sizes = [(-(-img.width // k), -(-img.height // k)) for img in images]
+    for img in images:
+        # Requesting the floored size makes draft pick exactly 1/k
+        if img.format == 'JPEG' and img.width >= k and img.height >= k:
+            img.draft(None, (img.width // k, img.height // k))
+    for img, size in zip(_decode_ahead(images), sizes):
+        if img.size != size:
+            # reduce() rejects 1, P and I;16 images and would average palette
+            # indices of PA ones; those are converted to RGB first, as paste()
+            # onto the RGB canvas would have done anyway
+            if img.mode not in _REDUCE_MODES:
+                converted = img.convert('RGB')
+                img.close()
+                img = converted
+            reduced = img.reduce(k)
+            img.close()
+            img = reduced
+        yield img
+
 def _stitch_vertical(images, target_width=None):
     """
     Stitch images vertically.
@@ -17,22 +138,38 @@ def _stitch_vertical(images, target_width=None):
     max_width = max(img.width for img in images)
     total_height = sum(img.height for img in images)
 
-    # Create new blank image
-    stitched_img = Image.new('RGB', (max_width, total_height), (255, 255, 255))
+    # When the result is scaled down to target_width anyway, the sources are
+    # decoded up to 8x smaller and pasted onto a canvas shrunk to match
+    k = _decode_factor(max_width, target_width)
+    canvas_width = -(-max_width // k)
+    canvas_height = sum(-(-img.height // k) for img in images)
+    decoded = _decode_reduced(images, k)
 
-    # Paste images
-    current_y = 0
-    for img in images:
-        # Center the image horizontally
-        x_offset = (max_width - img.width) // 2
-        stitched_img.paste(img, (x_offset, current_y))
-        current_y += img.height
+    if canvas_width * canvas_height * 3 > _MAPPED_CANVAS_BYTES:
+        stitched_img = _stitch_vertical_mapped(decoded, canvas_width, canvas_height)
+    else:
+        # Create new blank image. White is only needed for the margins left by
+        # narrower images; when every image spans the full width each pixel is
+        # pasted over anyway, so the canvas is left uninitialised.
+        fill = (255, 255, 255) if any(-(-img.width // k) != canvas_width for img in images) else None
+        stitched_img = Image.new('RGB', (canvas_width, canvas_height), fill)
 
-    # Resize if target_width is specified
+        # Paste images
+        current_y = 0
+        for img in decoded:
+            # Center the image horizontally
+            x_offset = (canvas_width - img.width) // 2
+            stitched_img.paste(img, (x_offset, current_y))
+            current_y += img.height
+            # Pasted pixels live on the canvas now; free the decoded source
+            img.close()
+
+    # Resize if target_width is specified (the output size always follows
+    # the full-resolution layout)
     if target_width:
         aspect_ratio = total_height / max_width
         new_height = int(target_width * aspect_ratio)
-        stitched_img = stitched_img.resize((target_width, new_height), Image.Resampling.LANCZOS)
+        stitched_img = downscale(stitched_img, (target_width, new_height))
 
     return stitched_img
 
@@ -46,33 +183,66 @@ def _stitch_horizontal(images, target_width=None):
     # Find max height
     max_height = max(img.height for img in images)
     
-    # Resize images to match max_height (preserving aspect ratio)
-    resized_images = []
-    total_width = 0
+    # Widths after matching max_height (preserving aspect ratio), from the
+    # headers alone, so each image is resized only when it is pasted and no
+    # more than one decoded image is held next to the canvas
+    widths = []
     for img in images:
         if img.height != max_height:
             aspect = img.width / img.height
-            new_w = int(max_height * aspect)
-            resized = img.resize((new_w, max_height), Image.Resampling.LANCZOS)
-            resized_images.append(resized)
-            total_width += new_w
+            widths.append(int(max_height * aspect))
         else:
-            resized_images.append(img)
-            total_width += img.width
+            widths.append(img.width)
+    total_width = sum(widths)
+
+    if target_width and total_width * max_height * 3 > _DIRECT_SCALE_BYTES:
+        return _stitch_horizontal_scaled(images, widths, total_width, max_height, target_width)
             
-    # Create canvas
-    stitched_img = Image.new('RGB', (total_width, max_height), (255, 255, 255))
+    # Create canvas. Every column is covered by a max_height image, so the
+    # white fill would be painted over entirely and is skipped.
+    stitched_img = Image.new('RGB', (total_width, max_height), None)
     
     current_x = 0
-    for img in resized_images:
+    for img, new_w in zip(_decode_ahead(images), widths):
+        if img.height != max_height:
+            resized = resize_lanczos(img, (new_w, max_height))
+            img.close()
+            img = resized
         stitched_img.paste(img, (current_x, 0))
         current_x += img.width
+        img.close()
         
     # Resize if target_width is specified
     if target_width:
         aspect_ratio = max_height / total_width
         new_height = int(target_width * aspect_ratio)
-        stitched_img = stitched_img.resize((target_width, new_height), Image.Resampling.LANCZOS)
+        stitched_img = downscale(stitched_img, (target_width, new_height))
+        
+    return stitched_img
+
+def _stitch_horizontal_scaled(images, widths, total_width, max_height, target_width):
+    """
+    _stitch_horizontal for very wide panoramas with a target width: each
+    image is resized straight to its share of the output, so the
+    full-resolution strip (gigabytes for 100k px panoramas) is never
+    allocated. Seams may differ from scaling the whole strip by about a pixel.
+    """
+    scale = target_width / total_width
+    new_height = int(target_width * (max_height / total_width))
+    stitched_img = Image.new('RGB', (target_width, new_height), None)
+    
+    current_x = 0
+    for img, new_w in zip(_decode_ahead(images), widths):
+        # Edges come from the running full-size offset, so the rounded
+        # pieces always add up to exactly target_width
+        left = round(current_x * scale)
+        current_x += new_w
+        right = round(current_x * scale)
+        if right > left:
+            resized = resize_lanczos(img, (right - left, new_height))
+            stitched_img.paste(resized, (left, 0))
+            resized.close()
+        img.close()
         
     return stitched_img
 
@@ -94,38 +264,98 @@ def _stitch_grid(images, rows, cols, target_width=None):
     count = min(len(images), rows * cols)
     used_images = images[:count]
     
-    # Create canvas
+    # Create canvas; white only shows in the empty cells of a partial grid,
+    # a full grid overwrites every pixel so the fill is skipped
     canvas_w = ref_w * cols
     canvas_h = ref_h * rows
-    stitched_img = Image.new('RGB', (canvas_w, canvas_h), (255, 255, 255))
-    
-    idx = 0
-    for r in range(rows):
-        for c in range(cols):
-            if idx >= len(used_images):
-                break
-                
-            img = used_images[idx]
-            
-            # Resize if needed
-            if img.size != (ref_w, ref_h):
-                img = img.resize((ref_w, ref_h), Image.Resampling.LANCZOS)
-                
-            x = c * ref_w
-            y = r * ref_h
-            stitched_img.paste(img, (x, y))
+    fill = (255, 255, 255) if count < rows * cols else None
+    stitched_img = Image.new('RGB', (canvas_w, canvas_h), fill)
+    
+    # Fill row by row, left to right
+    for idx, img in enumerate(_decode_ahead(used_images)):
+        r, c = divmod(idx, cols)
+        
+        # Resize if needed
+        if img.size != (ref_w, ref_h):
+            resized = resize_lanczos(img, (ref_w, ref_h))
+            img.close()
+            img = resized
             
-            idx += 1
+        x = c * ref_w
+        y = r * ref_h
+        stitched_img.paste(img, (x, y))
+        img.close()
             
     # Resize final output
     if target_width:
         aspect = canvas_h / canvas_w
         new_height = int(target_width * aspect)
-        stitched_img = stitched_img.resize((target_width, new_height), Image.Resampling.LANCZOS)
+        stitched_img = downscale(stitched_img, (target_width, new_height))
         
     return stitched_img
 
 
+def _stitch_group(group_paths, base_name, ext, fmt_arg, output_dir, mode, rows, cols, target_width=None, max_kb=None):
+    """
+    Stitch one group of images and save it as base_name + ext in output_dir.
+    Module-level so it can run in a worker process.
+    Returns the saved filename, or None if nothing was produced.
+    """
+    if not group_paths:
+        return None
+
+    # Opening reads each file's header; on slow or network disks those reads
+    # are mostly waiting, so they overlap on threads. map() keeps the order.
+    with ThreadPoolExecutor(max_workers=min(16, len(group_paths))) as executor:
+        images = [img for img in executor.map(_open, group_paths) if img is not None]
+    
+    if not images:
+        return None
+
+    # Each layout closes a source as soon as it is pasted, so decoded images
+    # are released one by one; the finally also covers unused/failed ones
+    result_img = None
+    try:
+        if mode == 'vertical':
+            result_img = _stitch_vertical(images, target_width)
+        elif mode == 'horizontal':
+            result_img = _stitch_horizontal(images, target_width)
+        elif mode == 'grid':
+            result_img = _stitch_grid(images, rows, cols, target_width)
+    finally:
+        for img in images:
+            img.close()
+    
+    if not result_img:
+        return None
+    
+    filename = f"{base_name}{ext}"
+    output_path = os.path.join(output_dir, filename)
+    
+    counter = 1
+    while True:
+        # Claim the name by creating the file exclusively, so stitch jobs
+        # running at the same time never pick the same output name
+        try:
+            open(output_path, "x").close()
+            break
+        except FileExistsError:
+            # Append counter if the name already exists
+            filename = f"{base_name}_{counter}{ext}"
+            output_path = os.path.join(output_dir, filename)
+            counter += 1
+    
+    from utils import save_compressed_image
+    try:
+        # Pass format explicitly
+        save_compressed_image(result_img, output_path, max_kb, output_format=fmt_arg)
+    except BaseException:
+        # Release the claimed name rather than leave an empty file behind
+        os.remove(output_path)
+        raise
+    return filename
+
+
 def stitch_images(image_paths, output_dir, split_count=1, target_width=None, max_kb=None, mode='vertical', rows=2, cols=2, output_format='AUTO', custom_name=None):
     """
     Stitches images based on mode.
@@ -173,56 +403,29 @@ def stitch_images(image_paths, output_dir, split_count=1, target_width=None, max
             ext = ".jpg"
             fmt_arg = 'JPEG'
 
-        for i, group_paths in enumerate(groups):
-            if not group_paths:
-                continue
-
-            images = []
-            for path in group_paths:
-                try:
-                    img = Image.open(path)
-                    images.append(img)
-                except Exception as e:
-                    print(f"Warning: Failed to open {path}: {e}")
-            
-            if not images:
-                continue
-
-            result_img = None
-            if mode == 'vertical':
-                result_img = _stitch_vertical(images, target_width)
-            elif mode == 'horizontal':
-                result_img = _stitch_horizontal(images, target_width)
-            elif mode == 'grid':
-                result_img = _stitch_grid(images, rows, cols, target_width)
-            
-            if result_img:
-                if custom_name:
-                    if len(groups) > 1:
-                        base_name = f"{custom_name}_p{i+1}"
-                    else:
-                        base_name = custom_name
+        base_names = []
+        for i in range(len(groups)):
+            if custom_name:
+                if len(groups) > 1:
+                    base_names.append(f"{custom_name}_p{i+1}")
                 else:
-                    base_name = f"stitched_{mode}_{timestamp}_p{i+1}"
-                
-                filename = f"{base_name}{ext}"
-                output_path = os.path.join(output_dir, filename)
-                
-                counter = 1
-                while os.path.exists(output_path):
-                    if custom_name:
-                         # Append counter if custom name exists and conflicts
-                        filename = f"{base_name}_{counter}{ext}"
-                    else:
-                        # Existing logic for timestamps (already has p{i+1}) but let's be safe
-                        filename = f"{base_name}_{counter}{ext}"
-                    output_path = os.path.join(output_dir, filename)
-                    counter += 1
-                
-                from utils import save_compressed_image
-                # Pass format explicitly
-                save_compressed_image(result_img, output_path, max_kb, output_format=fmt_arg)
-                saved_files.append(filename)
+                    base_names.append(custom_name)
+            else:
+                base_names.append(f"stitched_{mode}_{timestamp}_p{i+1}")
+
+        if len(groups) > 1:
+            # Split groups are independent (distinct _p{i} names), so each is
+            # stitched and encoded in its own worker process.
+            from utils import get_process_pool
+            pool = get_process_pool()
+            futures = [pool.submit(_stitch_group, group_paths, base_name, ext, fmt_arg, output_dir,
+                                   mode, rows, cols, target_width, max_kb)
+                       for group_paths, base_name in zip(groups, base_names)]
+            results = [f.result() for f in futures]
+        else:
+            results = [_stitch_group(groups[0], base_names[0], ext, fmt_arg, output_dir,
+                                     mode, rows, cols, target_width, max_kb)]
+        saved_files = [f for f in results if f]
 
         return True, f"Successfully created {len(saved_files)} images ({mode}, {output_format})."
 
@@ -0,0 +1,29 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from slicer import _save_slices
+
+
+class SaveSlicesTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_auto_returns_written_names(self):
+        # Top half flat white, bottom half noise
+        pixels = np.full((200, 100, 3), 255, dtype=np.uint8)
+        pixels[100:] = np.random.default_rng(0).integers(0, 256, (100, 100, 3), dtype=np.uint8)
+        img = Image.fromarray(pixels)
+        jobs = [((0, 0, 100, 100), os.path.join(self.tmp.name, 'a_01.jpg')),
+                ((0, 100, 100, 200), os.path.join(self.tmp.name, 'a_02.jpg'))]
+        saved = _save_slices(img, jobs, None, 'JPEG', auto=True)
+        self.assertEqual(saved, ['a_01.png', 'a_02.jpg'])
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), saved)
+
+
+if __name__ == '__main__':
+    unittest.main()
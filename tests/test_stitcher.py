@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from PIL import Image
+
+from stitcher import _stitch_group, _stitch_vertical
+
+
+class StitchVerticalReducedTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _source(self, name, img):
+        path = os.path.join(self.tmp.name, name)
+        img.save(path)
+        return path
+
+    def test_modes_reduce_rejects(self):
+        # target_width far below the source width: sources are decoded reduced
+        rgb = Image.new('RGB', (1200, 300), (0, 0, 255))
+        paths = [
+            self._source('a.jpg', rgb),
+            self._source('b.png', rgb.quantize(16)),  # P
+            self._source('c.gif', Image.new('P', (1200, 200), 3)),
+            self._source('d.png', Image.new('1', (1200, 100), 1)),
+            self._source('e.png', Image.new('I;16', (1200, 100), 1000)),
+        ]
+        images = [Image.open(p) for p in paths]
+        try:
+            result = _stitch_vertical(images, target_width=100)
+        finally:
+            for img in images:
+                img.close()
+        self.assertEqual(result.size, (100, 83))
+        self.assertEqual(result.mode, 'RGB')
+        # The palette image keeps its colour
+        r, g, b = result.getpixel((50, 35))
+        self.assertLess(r, 40)
+        self.assertGreater(b, 200)
+
+
+class StitchGroupTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.out_dir = os.path.join(self.tmp.name, 'out')
+        os.mkdir(self.out_dir)
+        self.paths = []
+        for name in ('1.png', '2.png'):
+            path = os.path.join(self.tmp.name, name)
+            Image.new('RGB', (40, 30), 'red').save(path)
+            self.paths.append(path)
+
+    def _stitch(self):
+        return _stitch_group(self.paths, 'result', '.jpg', 'JPEG', self.out_dir, 'vertical', 2, 2)
+
+    def test_failed_save_releases_name(self):
+        with mock.patch('utils.save_compressed_image', side_effect=MemoryError):
+            with self.assertRaises(MemoryError):
+                self._stitch()
+        self.assertEqual(os.listdir(self.out_dir), [])
+        # The retry gets the plain name, not result_1
+        self.assertEqual(self._stitch(), 'result.jpg')
+        self.assertGreater(os.path.getsize(os.path.join(self.out_dir, 'result.jpg')), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+from PIL import Image
+
+import utils
+from utils import _PDF_OVERHEAD, _write_jpeg_pdf, get_process_pool, save_compressed_image
+
+
+def _noise(size=(800, 800), mode='RGB'):
+    rng = np.random.default_rng(0)
+    pixels = rng.integers(0, 256, (size[1], size[0], 3), dtype=np.uint8)
+    return Image.fromarray(pixels).convert(mode)
+
+
+class SaveCompressedJpegTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, 'out.jpg')
+
+    def assertValidJpeg(self, size):
+        with Image.open(self.path) as img:
+            img.load()
+            self.assertEqual(img.format, 'JPEG')
+            self.assertEqual(img.size, size)
+
+    def test_noise_without_limit(self):
+        # Too much entropy for Pillow's progressive encode buffer
+        save_compressed_image(_noise(), self.path, None, 'JPEG')
+        self.assertValidJpeg((800, 800))
+
+    def test_noise_with_loose_limit(self):
+        save_compressed_image(_noise(), self.path, 2000, 'JPEG')
+        self.assertValidJpeg((800, 800))
+        self.assertLessEqual(os.path.getsize(self.path), 2000 * 1024)
+
+    def test_noise_prints_no_libjpeg_error(self):
+        # libjpeg writes to the C-level stderr, so the save runs in a child
+        code = ("from tests.test_utils import _noise; from utils import save_compressed_image; "
+                f"save_compressed_image(_noise(), {self.path!r}, None, 'JPEG')")
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertNotIn('Suspension', result.stderr)
+
+    def test_limit_is_kept(self):
+        save_compressed_image(_noise(), self.path, 300, 'JPEG')
+        self.assertValidJpeg((800, 800))
+        self.assertLessEqual(os.path.getsize(self.path), 300 * 1024)
+
+    def test_plain_image_is_progressive(self):
+        img = Image.linear_gradient('L').resize((600, 400)).convert('RGB')
+        save_compressed_image(img, self.path, None, 'JPEG')
+        with Image.open(self.path) as out:
+            self.assertTrue(out.info.get('progressive'))
+
+
+class SaveCompressedPdfTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, 'out.pdf')
+
+    def test_overhead_reserve_covers_pymupdf(self):
+        # The size limit holds only while the PDF adds at most _PDF_OVERHEAD
+        # bytes around the embedded JPEG
+        for mode in ('RGB', 'L'):
+            buf = io.BytesIO()
+            _noise((300, 200), mode).save(buf, 'JPEG', quality=80)
+            _write_jpeg_pdf(buf, (300, 200), 72.0, self.path)
+            self.assertLessEqual(os.path.getsize(self.path) - buf.tell(), _PDF_OVERHEAD)
+
+    def test_limit_is_kept(self):
+        for max_kb in (60, 150, 400):
+            save_compressed_image(_noise((600, 600)), self.path, max_kb, 'PDF')
+            self.assertLessEqual(os.path.getsize(self.path), max_kb * 1024)
+
+
+class ProcessPoolTest(unittest.TestCase):
+    def tearDown(self):
+        if utils._process_pool is not None:
+            utils._process_pool.shutdown()
+            utils._process_pool = None
+
+    def test_broken_pool_is_replaced(self):
+        pool = get_process_pool()
+        with self.assertRaises(BrokenProcessPool):
+            pool.submit(os._exit, 1).result()
+        pool = get_process_pool()
+        self.assertEqual(pool.submit(abs, -1).result(), 1)
+        self.assertIs(get_process_pool(), pool)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,213 @@
 
 import os
 import io
-from PIL import Image
+import math
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageFile
+
+# Optional: OpenCV's INTER_AREA for the final downscale of stitched images.
+# Falls back to Pillow's LANCZOS when the package is missing.
+try:
+    import numpy as np
+    import cv2
+except Exception:
+    cv2 = None
+
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+def get_process_pool():
+    """
+    Returns the app-wide worker process pool, creating it on first use.
+    Image decode/resize/encode spread across every core this way instead
+    of queueing behind one interpreter's GIL.
+    A pool broken by a dying worker (out of memory, a crash in native
+    code) is shut down and replaced, so only the jobs it was running fail.
+    """
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is not None and getattr(_process_pool, '_broken', False):
+            _process_pool.shutdown(wait=False, cancel_futures=True)
+            _process_pool = None
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+        return _process_pool
+
+def resize_lanczos(image, size):
+    """
+    LANCZOS resize used for every size change in slicing/stitching.
+    Large downscales first shrink by an integer factor with reduce() (a
+    cheap box filter) to within 3x of the target, then finish with LANCZOS;
+    Pillow documents a gap of 3 as indistinguishable from a straight resample.
+    """
+    return image.resize(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+def downscale(image, size):
+    """
+    Final shrink of a stitched image to the target width. With OpenCV
+    installed, RGB/L images are shrunk with INTER_AREA (area averaging: no
+    aliasing, and several times faster than LANCZOS on tall composites);
+    otherwise, when enlarging, or for other modes (the memory-mapped RGBX
+    canvas, which np.asarray would copy into RAM) it is resize_lanczos.
+    """
+    if cv2 is None or image.mode not in ('RGB', 'L') or size[0] >= image.width or size[1] >= image.height:
+        return resize_lanczos(image, size)
+    return Image.fromarray(cv2.resize(np.asarray(image), size, interpolation=cv2.INTER_AREA))
+
+# Bytes a one-page PyMuPDF document adds around its JPEG stream (objects,
+# xref and an sRGB profile: about 3.4 KB), reserved when a PDF must fit max_kb
+_PDF_OVERHEAD = 4096
+
+def _jpeg_scale(quality):
+    """libjpeg's quantization table scale (in percent) for a quality setting."""
+    return 5000 / quality if quality < 50 else 200 - 2 * quality
+
+def _jpeg_quality(scale):
+    """Inverse of _jpeg_scale."""
+    return 5000 / scale if scale > 100 else (200 - scale) / 2
+
+def search_jpeg_quality(probe, target_bytes, under, over, tolerance=3):
+    """
+    Narrow a JPEG quality bracket to within `tolerance` steps and return
+    the final `under`. `under` and `over` are (quality, size) probes that
+    fit target_bytes and exceed it; probe(q) encodes at q and returns
+    (q, size). Every probe that fits becomes the new `under`, so the
+    returned quality is always the last one that fitted.
+    """
+    # log(size) is close to linear in the log of libjpeg's quantizer scale,
+    # far straighter than against quality itself, so the next probe is
+    # interpolated there (regula falsi). When the same end of the bracket
+    # is replaced twice in a row, the other end's weight is halved (the
+    # Illinois rule) so the bracket keeps shrinking from both sides.
+    # Stopping within a few quality steps of the best saves the last
+    # encodes of a full binary search for an invisible difference.
+    log_target = math.log(target_bytes)
+    under_err = math.log(under[1]) - log_target
+    over_err = math.log(over[1]) - log_target
+    last_fit = None
+    while over[0] - under[0] > tolerance:
+        lo = math.log(_jpeg_scale(under[0]))
+        hi = math.log(_jpeg_scale(over[0]))
+        x = lo + (hi - lo) * under_err / (under_err - over_err)
+        q = int(_jpeg_quality(math.exp(x)))
+        q = min(over[0] - 1, max(under[0] + 1, q))
+        result = probe(q)
+        err = math.log(result[1]) - log_target
+        fits = result[1] <= target_bytes
+        if fits:
+            under, under_err = result, err
+            if last_fit is True:
+                over_err /= 2
+        else:
+            over, over_err = result, err
+            if last_fit is False:
+                under_err /= 2
+        last_fit = fits
+    return under
+
+def _write_buffer(buf, output_path):
+    """
+    Write an already encoded BytesIO to disk in a single write. Only the
+    bytes before the current position are written: probe buffers are
+    rewound and overwritten rather than truncated (see encode_into).
+    """
+    with open(output_path, "wb") as f:
+        with buf.getbuffer() as view:
+            f.write(view[:buf.tell()])
+
+def encode_into(buf, image, fmt, **kwargs):
+    """
+    Encode image into buf from the start and return the encoded size.
+    The buffer keeps its allocation between quality probes; truncating
+    would shrink and regrow it (a realloc and copy) on every probe.
+    """
+    buf.seek(0)
+    image.save(buf, fmt, **kwargs)
+    return buf.tell()
+
+def _fit_jpeg(image, target_bytes, save_kwargs, min_quality):
+    """
+    Encode image as JPEG (with save_kwargs) at about the highest quality up
+    to 95 whose size fits target_bytes. Returns (quality, buf), buf holding
+    that encode positioned at its end; if even min_quality is too big, its
+    encode is returned.
+    """
+    # Every probe is encoded into a reused buffer; a probe that fits is
+    # kept as best_buf (the previous best becomes the scratch), so the
+    # chosen quality is never encoded twice
+    buf = io.BytesIO()
+    best_buf = None
+    
+    def probe(q):
+        nonlocal buf, best_buf
+        size = encode_into(buf, image, "JPEG", **dict(save_kwargs, quality=q))
+        if size <= target_bytes:
+            best_buf, buf = buf, best_buf or io.BytesIO()
+        return q, size
+    
+    # Check quality=95 first
+    over = probe(95)
+    if over[1] <= target_bytes:
+        return 95, best_buf
+        
+    # Bracket the target between a probe under it and one over it, then
+    # predict the quality from the size curve instead of bisecting
+    under = probe(40)
+    if under[1] > target_bytes:
+        over = under
+        under = probe(min_quality)
+        if under[1] > target_bytes:
+            # Even the lowest quality is too big: keep that encode
+            return min_quality, buf
+    under = search_jpeg_quality(probe, target_bytes, under, over)
+    return under[0], best_buf
+
+def _progressive_fits(image, quality, plain_size):
+    """
+    True if the progressive/optimized encode of image fits the output buffer
+    Pillow gives it, judged by the size of the plain encode at the same
+    quality. Pillow sizes that buffer at one byte per pixel (two from
+    quality 95), and for high-entropy images (noise) libjpeg runs out of it,
+    printing "Suspension not allowed here" before the save raises OSError.
+    """
+    per_pixel = 2 if quality >= 95 else 1
+    # Progressive output adds a few scan headers to the plain encode
+    return plain_size + 4096 <= max(ImageFile.MAXBLOCK, image.width * image.height * per_pixel)
+
+def _estimate_jpeg_size(image, save_kwargs, tiles=4, tile=64):
+    """
+    Estimated size of the plain JPEG encode of image, from one encode of a
+    mosaic of tiles x tiles samples spread over it, scaled up by pixel
+    count (measured within 20%, on the high side). None for images the
+    mosaic would cover anyway.
+    """
+    width, height = image.size
+    tw, th = min(tile, width), min(tile, height)
+    if width * height <= 4 * tiles * tiles * tw * th:
+        return None
+    mosaic = Image.new(image.mode, (tiles * tw, tiles * th))
+    for i in range(tiles):
+        for j in range(tiles):
+            x = (width - tw) * j // (tiles - 1)
+            y = (height - th) * i // (tiles - 1)
+            mosaic.paste(image.crop((x, y, x + tw, y + th)), (j * tw, i * th))
+    buf = io.BytesIO()
+    mosaic.save(buf, "JPEG", **save_kwargs)
+    return buf.tell() * width * height // (mosaic.width * mosaic.height)
+
+def _write_jpeg_pdf(buf, size, resolution, output_path):
+    """
+    Write the JPEG in buf as a one-page PDF, embedded as a DCTDecode
+    stream without re-encoding; the page is sized for `resolution` dpi.
+    """
+    import fitz  # PyMuPDF
+    width, height = size
+    doc = fitz.open()
+    page = doc.new_page(width=width * 72 / resolution, height=height * 72 / resolution)
+    with buf.getbuffer() as view:
+        page.insert_image(page.rect, stream=bytes(view[:buf.tell()]))
+    doc.save(output_path)
 
 def save_compressed_image(image, output_path, max_kb=None, output_format=None):
     """
@@ -33,7 +239,9 @@ def save_compressed_image(image, output_path, max_kb=None, output_format=None):
     
     # PDF Logic
     if fmt == 'PDF':
-        if image.mode != 'RGB':
+        # RGBX (a memory-mapped stitch canvas) and grayscale go to the JPEG
+        # encoder as they are
+        if image.mode not in ('RGB', 'RGBX', 'L'):
              image = image.convert('RGB')
         
         # Determine resolution for PDF (default to 72 if not present, or use image's DPI)
@@ -42,34 +250,21 @@ def save_compressed_image(image, output_path, max_kb=None, output_format=None):
             # dpi can be a tuple (x, y)
             resolution = float(dpi[0]) if isinstance(dpi, tuple) else float(dpi)
 
+        # The page is a plain JPEG embedded by PyMuPDF without re-encoding,
+        # so the quality search probes bare JPEG encodes instead of writing
+        # a whole PDF through Pillow for every probe
         if not max_kb or max_kb <= 0:
-            image.save(output_path, "PDF", resolution=resolution, quality=quality)
-            return
-            
-        target_bytes = max_kb * 1024
-        
-        min_q = 10
-        max_q = 95
-        best_q = min_q
-        
-        # Binary Search for Quality
-        while min_q <= max_q:
-            mid_q = (min_q + max_q) // 2
             buf = io.BytesIO()
-            image.save(buf, "PDF", resolution=resolution, quality=mid_q)
-            size = buf.tell()
-            
-            if size <= target_bytes:
-                best_q = mid_q
-                min_q = mid_q + 1
-            else:
-                max_q = mid_q - 1
-                
-        image.save(output_path, "PDF", resolution=resolution, quality=best_q)
+            image.save(buf, "JPEG", quality=quality)
+        else:
+            buf = _fit_jpeg(image, max(1, max_kb * 1024 - _PDF_OVERHEAD), {}, 10)[1]
+        _write_jpeg_pdf(buf, image.size, resolution, output_path)
         return
 
     # PNG Logic (Lossless, ignore max_kb usually)
     if fmt == 'PNG':
+        if image.mode == 'RGBX':
+            image = image.convert('RGB') # PNG has no RGBX mode
         if dpi:
             image.save(output_path, "PNG", optimize=True, dpi=dpi)
         else:
@@ -78,7 +273,10 @@ def save_compressed_image(image, output_path, max_kb=None, output_format=None):
 
     # JPEG Logic (Standard)
     if fmt == 'JPEG':
-        if image.mode != 'RGB':
+        # The encoder reads RGBX (a memory-mapped stitch canvas) as it is;
+        # converting would copy the whole canvas into RAM. Grayscale stays a
+        # one-channel JPEG: the same pixels for a third of the encode work.
+        if image.mode not in ('RGB', 'RGBX', 'L'):
             image = image.convert('RGB')
             
         # Use subsampling=0 (4:4:4) to prevent color bleed/blurriness
@@ -86,41 +284,35 @@ def save_compressed_image(image, output_path, max_kb=None, output_format=None):
         if dpi:
             save_kwargs['dpi'] = dpi
 
+        # Files are written progressive with optimized Huffman tables, 5-10%
+        # smaller at the same quality. That costs about four plain encodes,
+        # so the size search probes plain encodes and only the chosen
+        # quality is encoded this way; being smaller, it still fits.
+        final_kwargs = dict(save_kwargs, optimize=True, progressive=True)
+
         if not max_kb or max_kb <= 0:
-            image.save(output_path, "JPEG", **save_kwargs)
-            return
+            # Images well within the buffer by a sampled estimate are encoded
+            # progressive straight away; otherwise the plain encode decides
+            estimate = _estimate_jpeg_size(image, save_kwargs)
+            if estimate is not None and _progressive_fits(image, quality, estimate * 3 // 2):
+                try:
+                    image.save(output_path, "JPEG", **final_kwargs)
+                    return
+                except OSError:
+                    pass
+            probe_buf = io.BytesIO()
+            image.save(probe_buf, "JPEG", **save_kwargs)
+        else:
+            final_kwargs['quality'], probe_buf = _fit_jpeg(image, max_kb * 1024, save_kwargs, 5)
 
-        target_bytes = max_kb * 1024
-        
-        # Check current quality=95
-        buf = io.BytesIO()
-        image.save(buf, "JPEG", **save_kwargs)
-        if buf.tell() <= target_bytes:
-            with open(output_path, "wb") as f:
-                f.write(buf.getvalue())
-            return
-            
-        # Binary search
-        min_q = 5
-        max_q = 90
-        best_q = min_q
-        
-        while min_q <= max_q:
-            mid_q = (min_q + max_q) // 2
+        buf = probe_buf
+        if _progressive_fits(image, final_kwargs['quality'], probe_buf.tell()):
             buf = io.BytesIO()
-            # Update quality in kwargs
-            # NOTE: We maintain subsampling=0 and dpi for consistency
-            current_kwargs = save_kwargs.copy()
-            current_kwargs['quality'] = mid_q
-            
-            image.save(buf, "JPEG", **current_kwargs)
-            
-            if buf.tell() <= target_bytes:
-                best_q = mid_q
-                min_q = mid_q + 1
-            else:
-                max_q = mid_q - 1
-        
-        final_kwargs = save_kwargs.copy()
-        final_kwargs['quality'] = best_q
-        image.save(output_path, "JPEG", **final_kwargs)
+            try:
+                image.save(buf, "JPEG", **final_kwargs)
+            except OSError:
+                buf = probe_buf
+            # Progressive is smaller for all but some tiny images
+            if buf.tell() > probe_buf.tell():
+                buf = probe_buf
+        _write_buffer(buf, output_path)